@@ -0,0 +1,65 @@
+"""
+Admission control for calls to the ML service.
+
+At most `limit` calls run at once; up to `max_queue` more wait for a slot,
+for at most `queue_timeout` seconds.  Anything beyond that is shed straight
+away with Overloaded (429 when the queue is full, 503 when a queued call
+waited too long), carrying a Retry-After estimate from recent service times.
+"""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+
+
+class Overloaded(Exception):
+    def __init__(self, status_code, retry_after, reason):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    def __init__(self, limit=4, max_queue=32, queue_timeout=10.0):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = {"queue_full": 0, "queue_timeout": 0}
+        self._service_seconds = 1.0  # moving average of one call
+
+    def retry_after(self):
+        """Seconds until the current queue has probably drained (at least 1)."""
+        backlog = (self.waiting + self.active) / max(self.limit, 1)
+        return max(1, math.ceil(backlog * self._service_seconds))
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected["queue_full"] += 1
+                raise Overloaded(429, self.retry_after(), "ML service queue is full")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected["queue_timeout"] += 1
+                raise Overloaded(503, self.retry_after(), "timed out waiting for the ML service") from None
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.active += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+            self._service_seconds += 0.2 * (time.perf_counter() - start - self._service_seconds)
+
+    def stats(self):
+        return {"limit": self.limit, "active": self.active, "waiting": self.waiting,
+                "max_queue": self.max_queue, "rejected": dict(self.rejected)}
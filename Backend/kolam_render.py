@@ -0,0 +1,101 @@
+"""
+Kolam rendering for the /generate endpoint.
+
+Runs inside the process-pool workers of server.py, so everything here is a
+plain top-level function that takes and returns picklable values.  The
+drawing code itself lives in the "Python Test Generation" scripts
+(kolam_geometry, kolam_raster, kolam_tiles); KOLAM_LIB_DIR points at them.
+"""
+import os
+import random
+import sys
+
+from PIL import ImageColor
+
+KOLAM_LIB_DIR = os.environ.get(
+    "KOLAM_LIB_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Python Test Generation"),
+)
+if KOLAM_LIB_DIR not in sys.path:
+    sys.path.insert(0, KOLAM_LIB_DIR)
+
+import kolam_geometry as geometry  # noqa: E402
+from kolam_batch import slug  # noqa: E402
+
+TILE_PATTERN = "Tile Kolam"
+RANDOM_PATTERN = "random"
+PATTERNS = [TILE_PATTERN, *geometry.PATTERNS]
+FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+COLORS = ["white", "gold", "cyan", "orange", "magenta", "lightgreen", "lightblue", "tomato"]
+
+DPI = 96  # 1 image pixel per turtle pixel
+RENDER_VERSION = "1"  # bump when output changes, so ETags and cached renders expire
+MAX_PIXELS = 16_000_000
+
+
+# -----------------------------
+# Design parameters
+# -----------------------------
+def resolve(pattern, rows, cols, spacing, seed, color=None):
+    """
+    Fill in a concrete design: "random" picks a pattern and colour from the
+    seed, and a missing seed is drawn here so the response can report it.
+    color is a COLORS name or anything Pillow's ImageColor parses.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 31)
+    rng = random.Random(seed)
+    if pattern == RANDOM_PATTERN:
+        pattern = rng.choice(PATTERNS)
+        color = color or rng.choice(COLORS)
+    if pattern not in PATTERNS:
+        raise ValueError(f"unknown pattern {pattern!r}")
+    if color is not None and color not in COLORS:
+        try:
+            ImageColor.getrgb(color)
+        except ValueError:
+            raise ValueError(f"unknown color {color!r}") from None
+    if pattern == TILE_PATTERN:
+        cols = rows  # the tile engine only makes square grids
+    width = (cols - 1) * spacing + 2 * (spacing if pattern == TILE_PATTERN else geometry.MARGIN)
+    height = (rows - 1) * spacing + 2 * (spacing if pattern == TILE_PATTERN else geometry.MARGIN)
+    if width * height > MAX_PIXELS:
+        raise ValueError(f"{width}x{height} px is larger than the {MAX_PIXELS} px limit")
+    return {"pattern": pattern, "rows": rows, "cols": cols, "spacing": spacing,
+            "seed": seed, "color": color}
+
+
+def render_params(design):
+    """
+    The parameters a render actually depends on: only the tile engine uses
+    the seed ("random" has already been resolved to a pattern and colour).
+    """
+    if design["pattern"] == TILE_PATTERN:
+        return design
+    return {**design, "seed": None}
+
+
+def build(design):
+    if design["pattern"] == TILE_PATTERN:
+        import kolam_tiles
+        return kolam_tiles.generate_kolam_1d(
+            design["rows"], design["spacing"], seed=design["seed"],
+            color=design["color"] or "white",
+            lod=kolam_tiles.lod_for_spacing(design["spacing"]))
+    return geometry.build(design["pattern"], design["rows"], design["cols"],
+                          design["spacing"], color=design["color"])
+
+
+# -----------------------------
+# Pool worker
+# -----------------------------
+def render_design(design, fmt="png"):
+    """Render one resolved design; returns (bytes, media type)."""
+    kolam = build(design)
+    if fmt == "svg":
+        return geometry.render_svg(kolam).encode("utf-8"), FORMATS[fmt]
+    return geometry.render_png(kolam, DPI), FORMATS[fmt]
+
+
+def file_name(design, fmt="png"):
+    return f"{slug(design['pattern'])}_{design['rows']}x{design['cols']}_s{design['spacing']}_{design['seed']}.{fmt}"
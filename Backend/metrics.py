@@ -0,0 +1,100 @@
+"""
+Prometheus metrics for the backend, served at /metrics.
+
+Request latency is measured until the response headers are sent, so for
+the streaming /generate modes it is time-to-first-byte; the render histogram
+covers the work itself.
+"""
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30)
+
+REQUEST_SECONDS = Histogram(
+    "backend_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+IN_FLIGHT = Gauge(
+    "backend_requests_in_flight", "HTTP requests being handled", ["route"])
+UPSTREAM_SECONDS = Histogram(
+    "backend_ml_upstream_duration_seconds", "Latency of calls to ML_PIPELINE_URL",
+    ["outcome"], buckets=LATENCY_BUCKETS)
+RENDER_SECONDS = Histogram(
+    "backend_render_duration_seconds", "Kolam render time in the process pool",
+    ["format"], buckets=LATENCY_BUCKETS)
+RENDERS = Counter("backend_renders", "Kolams rendered (cache misses)", ["format"])
+
+
+def route_of(request):
+    """Route template (/generate/image), not the raw path, to keep label sets small."""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+async def track_request(request, call_next):
+    """FastAPI http middleware: latency histogram and in-flight gauge per route."""
+    route = route_of(request)
+    status = 500
+    start = time.perf_counter()
+    with IN_FLIGHT.labels(route).track_inprogress():
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            REQUEST_SECONDS.labels(request.method, route, str(status)).observe(time.perf_counter() - start)
+
+
+class StatsCollector:
+    """Exports the render cache, single-flight and admission counters on every scrape."""
+
+    def __init__(self, cache, flights, limiter=None):
+        self.cache = cache
+        self.flights = flights
+        self.limiter = limiter
+
+    def collect(self):
+        stats = self.cache.stats()
+        hits = CounterMetricFamily("backend_render_cache_hits", "Render cache hits", labels=["tier"])
+        hits.add_metric(["memory"], stats["memory_hits"])
+        hits.add_metric(["disk"], stats["disk_hits"])
+        yield hits
+        yield CounterMetricFamily("backend_render_cache_misses", "Render cache misses",
+                                  value=stats["misses"])
+        yield GaugeMetricFamily("backend_render_cache_hit_ratio", "Render cache hit ratio",
+                                value=stats["hit_ratio"])
+        yield GaugeMetricFamily("backend_render_cache_memory_bytes", "Bytes held by the memory tier",
+                                value=stats["memory_bytes"])
+
+        leaders = CounterMetricFamily("backend_coalesced_calls", "Single-flight calls by role",
+                                      labels=["kind", "role"])
+        in_flight = GaugeMetricFamily("backend_coalesced_in_flight", "Distinct computations in flight",
+                                      labels=["kind"])
+        for kind, flight in self.flights.items():
+            s = flight.stats()
+            leaders.add_metric([kind, "leader"], s["leaders"])
+            leaders.add_metric([kind, "follower"], s["followers"])
+            in_flight.add_metric([kind], s["in_flight"])
+        yield leaders
+        yield in_flight
+
+        if self.limiter is not None:
+            s = self.limiter.stats()
+            yield GaugeMetricFamily("backend_ml_active", "Calls to the ML service in progress",
+                                    value=s["active"])
+            yield GaugeMetricFamily("backend_ml_queued", "Calls waiting for an ML slot",
+                                    value=s["waiting"])
+            rejected = CounterMetricFamily("backend_ml_rejected", "Calls shed by admission control",
+                                           labels=["reason"])
+            for reason, count in s["rejected"].items():
+                rejected.add_metric([reason], count)
+            yield rejected
+
+
+def register_stats(cache, flights, limiter=None):
+    REGISTRY.register(StatsCollector(cache, flights, limiter))
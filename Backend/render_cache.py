@@ -0,0 +1,202 @@
+"""
+Two-tier cache for rendered kolams.
+
+Memory tier: an LRU of encoded images bounded by total bytes.
+Disk tier: content-addressed blobs (objects/<sha256 of the bytes>) plus one
+small ref file per parameter key (refs/<sha256 of the key>) naming the blob,
+so designs that render to identical bytes are stored once.  Blobs are
+touched on every hit and the least recently used ones are pruned (with the
+refs naming them) once the disk tier outgrows its byte budget.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def cache_key(*parts):
+    """Stable key for a design: canonical JSON of the parameters."""
+    return json.dumps(parts, sort_keys=True, separators=(",", ":"))
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class RenderCache:
+    # prune down to this fraction of the disk budget, so a full cache isn't
+    # rescanned on every store
+    PRUNE_TO = 0.9
+
+    def __init__(self, max_bytes=64 << 20, directory=None, max_disk_bytes=512 << 20):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self._prune_lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        if directory:
+            os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+            os.makedirs(os.path.join(directory, "refs"), exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._objects())
+
+    # -----------------------------
+    # Memory tier
+    # -----------------------------
+    def get(self, key):
+        """Memory lookup only; cheap enough to call on the event loop."""
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.memory_hits += 1
+            return data
+
+    def _remember(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    # -----------------------------
+    # Disk tier (blocking: call from a thread)
+    # -----------------------------
+    def _ref_path(self, key):
+        return os.path.join(self.directory, "refs", _digest(key.encode("utf-8")))
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest[2:])
+
+    def load(self, key):
+        """Disk lookup after a memory miss; promotes hits into memory."""
+        data = None
+        if self.directory:
+            try:
+                with open(self._ref_path(key), encoding="ascii") as f:
+                    digest = f.read().strip()
+                path = self._object_path(digest)
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)  # mtime doubles as the blob's last use
+            except OSError:
+                data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+        if data is not None:
+            self._remember(key, data)
+        return data
+
+    def store(self, key, data):
+        self._remember(key, data)
+        if not self.directory:
+            return
+        digest = _digest(data)
+        path = self._object_path(digest)
+        # existence check and write under one lock, so two threads storing
+        # the same new blob count its bytes once
+        with self._create_lock:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._atomic_write(path, data)
+                with self._lock:
+                    self._disk_bytes += len(data)
+        self._atomic_write(self._ref_path(key), digest.encode("ascii"))
+        if self._disk_bytes > self.max_disk_bytes:
+            self._prune()
+
+    def _objects(self):
+        """(mtime, size, path) of every blob on disk."""
+        for bucket in os.scandir(os.path.join(self.directory, "objects")):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield st.st_mtime, st.st_size, entry.path
+
+    def _prune(self):
+        """Delete least recently used blobs (and their refs) down to PRUNE_TO of the budget."""
+        if not self._prune_lock.acquire(blocking=False):
+            return  # another thread is already pruning
+        try:
+            objects = sorted(self._objects())
+            total = sum(size for _, size, _ in objects)
+            target = self.max_disk_bytes * self.PRUNE_TO
+            removed = set()
+            for _, size, path in objects:
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                removed.add(os.path.basename(os.path.dirname(path)) + os.path.basename(path))
+            if removed:
+                for entry in os.scandir(os.path.join(self.directory, "refs")):
+                    try:
+                        with open(entry.path, encoding="ascii") as f:
+                            if f.read().strip() in removed:
+                                os.unlink(entry.path)
+                    except OSError:
+                        continue
+            with self._lock:
+                self._disk_bytes = total
+                self.disk_evictions += len(removed)
+        finally:
+            self._prune_lock.release()
+
+    def _atomic_write(self, path, data):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    # -----------------------------
+    # Counters
+    # -----------------------------
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_items": len(self._items),
+                "memory_bytes": self._bytes,
+                "memory_max_bytes": self.max_bytes,
+                "disk": bool(self.directory),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.max_disk_bytes,
+                "disk_evictions": self.disk_evictions,
+            }
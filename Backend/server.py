@@ -1,10 +1,83 @@
-from fastapi import FastAPI, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import requests
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import base64
+import hashlib
+import json
+import tempfile
+import time
+import uuid
+import zipfile
+import httpx
 import os
+from urllib.parse import quote
 
-app = FastAPI(debug=True)
+import kolam_render
+from render_cache import RenderCache, cache_key
+from singleflight import SingleFlight
+from admission import AdmissionLimiter, Overloaded
+import metrics
+
+# -----------------------------
+# Render pool: kolam drawing is CPU-bound, keep it off the event loop
+# -----------------------------
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", os.cpu_count() or 1))
+render_pool = None
+
+# -----------------------------
+# Render cache: memory LRU (bytes-bounded) in front of a content-addressed disk store
+# -----------------------------
+RENDER_CACHE_BYTES = int(os.environ.get("RENDER_CACHE_BYTES", 64 << 20))
+RENDER_CACHE_DIR = os.environ.get(
+    "RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "kolam-render-cache"))
+RENDER_CACHE_DISK_BYTES = int(os.environ.get("RENDER_CACHE_DISK_BYTES", 512 << 20))
+render_cache = RenderCache(RENDER_CACHE_BYTES, RENDER_CACHE_DIR or None, RENDER_CACHE_DISK_BYTES)
+
+# concurrent identical requests share one render / one inference
+render_flights = SingleFlight()
+predict_flights = SingleFlight()
+
+# -----------------------------
+# Shared HTTP client for the ML pipeline (keep-alive connection pool)
+# -----------------------------
+ML_TIMEOUT = float(os.environ.get("ML_TIMEOUT", 20))
+ML_MAX_CONNECTIONS = int(os.environ.get("ML_MAX_CONNECTIONS", 100))
+ml_client = None
+
+# -----------------------------
+# Admission control for the ML service: ML_CONCURRENCY calls at once, a
+# bounded wait queue, and fast 429/503 + Retry-After beyond that
+# -----------------------------
+ml_limiter = AdmissionLimiter(
+    limit=int(os.environ.get("ML_CONCURRENCY", 4)),
+    max_queue=int(os.environ.get("ML_QUEUE_SIZE", 32)),
+    queue_timeout=float(os.environ.get("ML_QUEUE_TIMEOUT", 10)),
+)
+metrics.register_stats(render_cache, {"render": render_flights, "predict": predict_flights},
+                       ml_limiter)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global render_pool, ml_client
+    render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    ml_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(ML_TIMEOUT, connect=5.0),
+        limits=httpx.Limits(max_connections=ML_MAX_CONNECTIONS,
+                            max_keepalive_connections=ML_MAX_CONNECTIONS),
+    )
+    try:
+        yield
+    finally:
+        await ml_client.aclose()
+        render_pool.shutdown(cancel_futures=True)
+
+
+app = FastAPI(debug=True, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,6 +86,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(metrics.track_request)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 # -----------------------------
 # Config: Your ML pipeline URL (via ngrok)
@@ -20,40 +99,344 @@ app.add_middleware(
 ML_PIPELINE_URL = "http://ml-pipeline:5000/predict"
 
 # -----------------------------
-# Dummy image generation endpoint
+# Kolam generation endpoint
+# -----------------------------
+async def render(design, fmt, seeded=True):
+    """
+    Encoded image for a resolved design: memory, then disk, then the render
+    pool.  seeded=False means the seed was drawn for this request; such a
+    render is only cached when the pattern ignores the seed.
+    """
+    params = kolam_render.render_params(design)
+    key = cache_key(kolam_render.RENDER_VERSION, params, fmt)
+    store = seeded or params["seed"] is None  # a drawn seed is never asked for again
+    data = render_cache.get(key)
+    if data is None:
+        data = await render_flights.do(key, lambda: render_uncached(key, design, fmt, store))
+    return data, kolam_render.FORMATS[fmt]
+
+
+async def render_uncached(key, design, fmt, store=True):
+    data = await asyncio.to_thread(render_cache.load, key) if store else None
+    if data is None:
+        loop = asyncio.get_running_loop()
+        with metrics.RENDER_SECONDS.labels(fmt).time():
+            data, _ = await loop.run_in_executor(render_pool, kolam_render.render_design, design, fmt)
+        metrics.RENDERS.labels(fmt).inc()
+        if store:
+            await asyncio.to_thread(render_cache.store, key, data)
+    return data
+
+
+def resolve_designs(count, pattern, rows, cols, spacing, seed, color=None):
+    """Design i uses seed + i (or a fresh random seed); raises ValueError on bad params."""
+    return [
+        kolam_render.resolve(pattern, rows, cols, spacing, None if seed is None else seed + i, color)
+        for i in range(count)
+    ]
+
+
+def bad_request(error):
+    return JSONResponse(content={"error": str(error), "patterns": kolam_render.PATTERNS},
+                        status_code=400)
+
+
+# -----------------------------
+# HTTP caching: renders are deterministic, so the ETag comes from the
+# parameters and a matching If-None-Match is answered without rendering
+# -----------------------------
+def design_etag(designs, fmt, *extra):
+    keys = [cache_key(d, fmt) for d in designs]
+    digest = hashlib.sha256("\n".join([kolam_render.RENDER_VERSION, *extra, *keys]).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def cache_headers(etag, reproducible):
+    if not reproducible:  # random seeds: every response is different
+        return {"Cache-Control": "no-store"}
+    return {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+
+
+def not_modified(request, headers):
+    etag = headers.get("ETag")
+    match = request.headers.get("if-none-match")
+    if not etag or not match:
+        return False
+    return match.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in match.split(","))
+
+
+# -----------------------------
+# Batch results in completion order, at most STREAM_IN_FLIGHT renders at a time
+# -----------------------------
+STREAM_IN_FLIGHT = int(os.environ.get("STREAM_IN_FLIGHT", 2 * RENDER_WORKERS))
+
+
+async def completed_renders(designs, fmt, seeded=True, limit=STREAM_IN_FLIGHT):
+    """
+    Yield (index, design, data) as renders finish, with at most `limit`
+    in flight, so memory follows the pool's throughput rather than `count`.
+    """
+    async def one(i, design):
+        data, _ = await render(design, fmt, seeded)
+        return i, design, data
+
+    queue = iter(enumerate(designs))
+    pending = set()
+    try:
+        while True:
+            for i, design in queue:
+                pending.add(asyncio.ensure_future(one(i, design)))
+                if len(pending) >= limit:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+# -----------------------------
+# Binary batch bodies (zip / multipart), written as renders finish
+# -----------------------------
+class _ZipSink:
+    """Write-only, unseekable file for ZipFile; drained after every member."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+async def zip_body(designs, fmt, seeded):
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:  # PNGs are already deflated
+        async for _, design, data in completed_renders(designs, fmt, seeded):
+            zf.writestr(kolam_render.file_name(design, fmt), data)
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def multipart_body(designs, fmt, seeded, boundary):
+    async for _, design, data in completed_renders(designs, fmt, seeded):
+        name = kolam_render.file_name(design, fmt)
+        yield (f"--{boundary}\r\n"
+               f"Content-Type: {kolam_render.FORMATS[fmt]}\r\n"
+               f'Content-Disposition: attachment; filename="{name}"\r\n'
+               f"Content-Length: {len(data)}\r\n"
+               f"ETag: {design_etag([design], fmt)}\r\n\r\n").encode("utf-8")
+        yield data
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode("utf-8")
+
+
+# -----------------------------
+# Streaming results (NDJSON / Server-Sent Events)
 # -----------------------------
+def stream_item(request, i, design, data, fmt, inline):
+    item = {"index": i, "name": kolam_render.file_name(design, fmt), **design}
+    if inline:
+        item["data"] = base64.b64encode(data).decode("utf-8")
+    else:
+        params = {k: v for k, v in design.items() if v is not None}
+        item["url"] = str(request.url_for("generate_image").include_query_params(format=fmt, **params))
+    return item
+
+
+async def stream_items(request, designs, fmt, inline, seeded):
+    """
+    Records for ndjson/sse.  Inline records follow the renders as they
+    finish; URL records are sent straight away without rendering, since
+    each URL (which carries the resolved seed) renders and caches on demand.
+    """
+    if not inline:
+        for i, design in enumerate(designs):
+            yield stream_item(request, i, design, None, fmt, inline)
+        return
+    async for i, design, data in completed_renders(designs, fmt, seeded):
+        yield stream_item(request, i, design, data, fmt, inline)
+
+
+async def ndjson_body(request, designs, fmt, inline, seeded):
+    async for item in stream_items(request, designs, fmt, inline, seeded):
+        yield json.dumps(item) + "\n"
+
+
+async def sse_body(request, designs, fmt, inline, seeded):
+    sent = 0
+    async for item in stream_items(request, designs, fmt, inline, seeded):
+        yield f"event: design\ndata: {json.dumps(item)}\n\n"
+        sent += 1
+    yield f"event: done\ndata: {json.dumps({'count': sent})}\n\n"
+
+
 @app.get("/generate")
-async def generate_images(count: int = 10):
-    return "ok"
-    """Generate dummy images (for frontend demo)"""
-    import base64, io
-    from PIL import Image
-    import random
-
-    images = []
-    for i in range(count):
-        img = Image.new(
-            "RGB",
-            (128, 128),
-            color=(random.randint(0,255), random.randint(0,255), random.randint(0,255))
-        )
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        img_bytes = buf.getvalue()
-        img_b64 = base64.b64encode(img_bytes).decode("utf-8")
-        images.append({"name": f"image_{i}.png", "data": img_b64})
-
-    return JSONResponse(content={"images": images})
+async def generate_images(
+    request: Request,
+    count: int = Query(10, ge=1, le=500),
+    pattern: str = kolam_render.RANDOM_PATTERN,
+    rows: int = Query(7, ge=2, le=101),
+    cols: int = Query(7, ge=2, le=101),
+    spacing: int = Query(48, ge=10, le=200),
+    seed: int | None = None,
+    format: str = Query("png", pattern="^(png|svg)$"),
+    delivery: str = Query("json", pattern="^(json|zip|multipart|ndjson|sse)$"),
+    inline: bool = False,
+):
+    """
+    Render `count` kolams.  delivery=json returns base64 images in JSON;
+    zip and multipart stream the raw image bytes as each render finishes;
+    ndjson and sse stream one record per design with a /generate/image URL
+    (not rendered until fetched), or with the base64 image in completion
+    order when inline=true.
+    """
+    try:
+        designs = resolve_designs(count, pattern, rows, cols, spacing, seed)
+    except ValueError as e:
+        return bad_request(e)
+    headers = cache_headers(design_etag(designs, format, delivery, str(inline)), seed is not None)
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    if delivery == "ndjson":
+        return StreamingResponse(ndjson_body(request, designs, format, inline, seed is not None),
+                                 media_type="application/x-ndjson", headers=headers)
+    if delivery == "sse":
+        headers["X-Accel-Buffering"] = "no"  # let nginx-style proxies pass events through
+        return StreamingResponse(sse_body(request, designs, format, inline, seed is not None),
+                                 media_type="text/event-stream", headers=headers)
+    if delivery == "json":
+        rendered = await asyncio.gather(*(render(d, format, seed is not None) for d in designs))
+        images = [
+            {"name": kolam_render.file_name(d, format), **d,
+             "data": base64.b64encode(data).decode("utf-8")}
+            for d, (data, _) in zip(designs, rendered)
+        ]
+        return JSONResponse(content={"images": images}, headers=headers)
+
+    if delivery == "zip":
+        headers["Content-Disposition"] = 'attachment; filename="kolams.zip"'
+        return StreamingResponse(zip_body(designs, format, seed is not None),
+                                 media_type="application/zip", headers=headers)
+    boundary = uuid.uuid4().hex
+    return StreamingResponse(multipart_body(designs, format, seed is not None, boundary),
+                             media_type=f"multipart/mixed; boundary={boundary}", headers=headers)
+
+
+@app.get("/generate/image")
+async def generate_image(
+    request: Request,
+    pattern: str = kolam_render.RANDOM_PATTERN,
+    rows: int = Query(7, ge=2, le=101),
+    cols: int = Query(7, ge=2, le=101),
+    spacing: int = Query(48, ge=10, le=200),
+    seed: int | None = None,
+    color: str | None = None,
+    format: str = Query("png", pattern="^(png|svg)$"),
+):
+    """One kolam as raw image bytes (image/png or image/svg+xml)."""
+    try:
+        (design,) = resolve_designs(1, pattern, rows, cols, spacing, seed, color)
+    except ValueError as e:
+        return bad_request(e)
+    headers = cache_headers(design_etag([design], format), seed is not None)
+    headers["X-Kolam-Pattern"] = design["pattern"]
+    headers["X-Kolam-Seed"] = str(design["seed"])
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    data, media_type = await render(design, format, seed is not None)
+    headers["Content-Disposition"] = f'inline; filename="{kolam_render.file_name(design, format)}"'
+    return Response(content=data, media_type=media_type, headers=headers)
+
+
+@app.get("/generate/cache")
+async def generate_cache_stats():
+    return JSONResponse(content={**render_cache.stats(), "coalescing": render_flights.stats()})
 
 # -----------------------------
 # Forward file to your ML pipeline
 # -----------------------------
+UPLOAD_CHUNK_SIZE = 1 << 16
+UPLOAD_SPOOL_BYTES = 1 << 20  # larger uploads are buffered in a temp file
+
+
+async def buffer_upload(file: UploadFile):
+    """
+    Copy the upload into a spooled temp file, hashing it on the way.
+    Returns (sha256 hex, file); the copy belongs to the caller, so a
+    coalesced inference doesn't depend on the leader's request staying open.
+    """
+    digest = hashlib.sha256()
+    body = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    await file.seek(0)
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+        body.write(chunk)
+    body.seek(0)
+    return digest.hexdigest(), body
+
+
+async def body_chunks(body):
+    while chunk := body.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+async def forward_upload(body, filename, content_type):
+    # send the raw image body in chunks instead of re-encoding it as multipart;
+    # the ML service reads it straight off the socket
+    headers = {
+        "Content-Type": content_type or "application/octet-stream",
+        "X-Filename": quote(filename or "upload"),
+        "Content-Length": str(body.seek(0, os.SEEK_END)),
+    }
+    body.seek(0)
+    try:
+        async with ml_limiter.slot():
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                resp = await ml_client.post(ML_PIPELINE_URL, content=body_chunks(body), headers=headers)
+                outcome = str(resp.status_code)
+            finally:
+                metrics.UPSTREAM_SECONDS.labels(outcome).observe(time.perf_counter() - start)
+    finally:
+        body.close()
+    return resp.json()
+
+
 @app.post("/ml-predict")
 async def ml_predict(file: UploadFile):
     try:
-        files = {"image": (file.filename, file.file, file.content_type)}
-        resp = requests.post(ML_PIPELINE_URL, files=files, timeout=20)
-        return JSONResponse(content=resp.json())
+        key, body = await buffer_upload(file)
+        leader = False
+
+        def forward():
+            nonlocal leader
+            leader = True
+            return forward_upload(body, file.filename, file.content_type)
+
+        # identical uploads in flight at the same time share one inference,
+        # which owns (and closes) the leader's copy of the body
+        try:
+            return JSONResponse(content=await predict_flights.do(key, forward))
+        finally:
+            if not leader:
+                body.close()
+    except Overloaded as e:
+        return JSONResponse(content={"error": str(e)}, status_code=e.status_code,
+                            headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
@@ -0,0 +1,41 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one in-flight computation: the
+first caller (the leader) starts it, later callers (followers) await the same
+task.  The key is forgotten as soon as the task finishes, so this only
+deduplicates work that overlaps in time; caching is a separate layer.
+"""
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key, func):
+        """Await func() once per key across all concurrent callers."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.leaders += 1
+        else:
+            self.followers += 1
+        # shield: one caller disconnecting must not cancel the others' work
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    def in_flight(self):
+        return len(self._calls)
+
+    def stats(self):
+        return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._calls)}
@@ -1,48 +1,190 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
 from ultralytics import YOLO
+from batching import MicroBatcher
+from prediction_cache import PredictionCache, cache_key, content_digest, file_digest
+from preprocess import PREPROCESS_VERSION, load_for_detection, scale_boxes
 import os
+import time
 
 app = Flask(__name__)
 UPLOAD_FOLDER = '/data'
+ANNOTATED_FOLDER = os.path.join(UPLOAD_FOLDER, 'annotated')  # only used with ?save=1
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+CHUNK_SIZE = 1 << 16
 
-# Load YOLO model
-model = YOLO('my_model/my_model.pt')
+# Load YOLO model.  MODEL_BACKEND picks PyTorch or an ONNX Runtime export
+# (python export_onnx.py all); MODEL_PATH overrides the file.
+MODEL_PATHS = {
+    'torch': 'my_model/my_model.pt',
+    'onnx': 'my_model/my_model.onnx',
+    'onnx-int8': 'my_model/my_model.int8.onnx',
+}
+MODEL_BACKEND = os.environ.get('MODEL_BACKEND', 'torch')
+MODEL_PATH = os.environ.get('MODEL_PATH', MODEL_PATHS[MODEL_BACKEND])
+if MODEL_BACKEND == 'torch':
+    model = YOLO(MODEL_PATH)
+    # Fuse conv+bn now rather than on the first predict, so a pre-forking
+    # server (gunicorn.conf.py) shares the fused weights between workers.
+    model.fuse()
+else:
+    model = YOLO(MODEL_PATH, task='detect')
+MODEL_VERSION = file_digest(MODEL_PATH)[:16]
 
 # Define class names in the same order as your training
 class_names = ["Kolam", "Rangoli"]
 
+# Prometheus metrics, served at /metrics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+REQUEST_SECONDS = Histogram('ml_request_duration_seconds', 'HTTP request latency by route',
+                            ['method', 'route', 'status'], buckets=LATENCY_BUCKETS)
+IN_FLIGHT = Gauge('ml_requests_in_flight', 'HTTP requests being handled', ['route'],
+                  multiprocess_mode='livesum')
+INFERENCE_SECONDS = Histogram('ml_inference_duration_seconds', 'YOLO model.predict time per batch',
+                              buckets=LATENCY_BUCKETS)
+BATCH_SIZE = Histogram('ml_batch_size', 'Images per batched YOLO call',
+                       buckets=(1, 2, 4, 8, 16, 32, 64))
+CACHE_LOOKUPS = Counter('ml_prediction_cache_lookups', 'Prediction cache lookups', ['result'])
+BATCH_QUEUE = Gauge('ml_batch_queue_depth', 'Images waiting for the next batch',
+                    multiprocess_mode='livesum')
+BATCH_MAX_SIZE_GAUGE = Gauge('ml_batch_max_size', 'Configured BATCH_MAX_SIZE',
+                             multiprocess_mode='max')
+BATCH_MAX_WAIT_GAUGE = Gauge('ml_batch_max_wait_seconds', 'Configured BATCH_MAX_WAIT_MS in seconds',
+                             multiprocess_mode='max')
+
+@app.before_request
+def start_request_timer():
+    g.route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.start = time.perf_counter()
+    IN_FLIGHT.labels(g.route).inc()
+
+@app.after_request
+def observe_request(response):
+    REQUEST_SECONDS.labels(request.method, g.route, str(response.status_code)).observe(
+        time.perf_counter() - g.start)
+    return response
+
+@app.teardown_request
+def end_request(exc):
+    if 'route' in g:
+        IN_FLIGHT.labels(g.route).dec()
+
+# Micro-batching: concurrent requests share one model.predict call of up to
+# BATCH_MAX_SIZE images, waiting at most BATCH_MAX_WAIT_MS for the batch to fill
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 8))
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 5))
+
+def predict_batch(images):
+    return model.predict(source=images, save=False, verbose=False)
+
+def observe_batch(size, seconds):
+    BATCH_SIZE.observe(size)
+    INFERENCE_SECONDS.observe(seconds)
+
+batcher = MicroBatcher(predict_batch, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS / 1000,
+                       on_batch=observe_batch, on_queue=BATCH_QUEUE.set)
+BATCH_MAX_SIZE_GAUGE.set(BATCH_MAX_SIZE)
+BATCH_MAX_WAIT_GAUGE.set(BATCH_MAX_WAIT_MS / 1000)
+
+# Prediction cache: same image bytes + same model -> same predictions
+prediction_cache = PredictionCache(
+    max_items=int(os.environ.get('PREDICTION_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('PREDICTION_CACHE_TTL', 86400)),
+    path=os.environ.get('PREDICTION_CACHE_PATH') or None,  # e.g. /data/predictions.sqlite
+    max_rows=int(os.environ.get('PREDICTION_CACHE_ROWS', 100_000)),
+)
+
+@app.route('/metrics')
+def metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        # several gunicorn workers: aggregate their metric files
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+def read_upload():
+    """
+    The uploaded image bytes.  Accepts a multipart 'image' field, or a raw
+    image body (streamed by the backend); a raw body is returned as the
+    bytearray it was read into, without a second copy.
+    Returns (data, None) or (None, error response).
+    """
+    if request.mimetype == 'multipart/form-data':
+        if 'image' not in request.files:
+            return None, (jsonify({'error': 'No image uploaded'}), 400)
+        file = request.files['image']
+        if file.filename == '':
+            return None, (jsonify({'error': 'No selected file'}), 400)
+        return file.read(), None
+
+    if not request.content_length and not request.headers.get('Transfer-Encoding'):
+        return None, (jsonify({'error': 'No image uploaded'}), 400)
+    buf = bytearray()
+    while chunk := request.stream.read(CHUNK_SIZE):
+        buf += chunk
+    return buf, None
+
+# Uploads are decoded straight down to about the model's input size (JPEGs
+# at reduced scale, the rest area-resized) and boxes are mapped back to the
+# original image; DETECT_SIZE=0 decodes at full resolution
+DETECT_SIZE = int(os.environ.get('DETECT_SIZE', 640))
+# cached predictions are only valid for the same model and the same preprocessing
+PREDICTION_VERSION = f'{MODEL_VERSION}:{DETECT_SIZE}:{PREPROCESS_VERSION}'
+
+def decode_image(data):
+    """Encoded image bytes -> (BGR array for YOLO, (sx, sy) back to original pixels), or (None, None)."""
+    return load_for_detection(data, DETECT_SIZE or float('inf'))
+
+def to_predictions(results):
+    predictions = []
+    for r in results:
+        if hasattr(r, "boxes") and r.boxes is not None and len(r.boxes) > 0:
+            xyxy_list = r.boxes.xyxy.tolist()
+            conf_list = r.boxes.conf.tolist()
+            cls_list = r.boxes.cls.tolist()
+            for box, conf, cls in zip(xyxy_list, conf_list, cls_list):
+                predictions.append({
+                    'bbox': [float(x) for x in box],
+                    'confidence': float(conf),
+                    'label': class_names[int(cls)]
+                })
+    return predictions
+
+def wants_annotated():
+    return request.args.get('save', '').lower() in ('1', 'true', 'yes')
+
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
-        if 'image' not in request.files:
-            return jsonify({'error': 'No image uploaded'}), 400
+        data, error = read_upload()
+        if error:
+            return error
+        digest = content_digest(data)
+        key = cache_key(digest, PREDICTION_VERSION)
+        if not wants_annotated():
+            cached = prediction_cache.get(key)
+            CACHE_LOOKUPS.labels('miss' if cached is None else 'hit').inc()
+            if cached is not None:
+                return jsonify({'predictions': cached})
+        image, scale = decode_image(data)
+        if image is None:
+            return jsonify({'error': 'Could not decode image'}), 400
 
-        file = request.files['image']
-        if file.filename == '':
-            return jsonify({'error': 'No selected file'}), 400
-
-        # Save uploaded image
-        filepath = os.path.join(UPLOAD_FOLDER, file.filename)
-        file.save(filepath)
-
-        # Run prediction and save annotated image
-        results = model.predict(source=filepath, save=True)
-
-        predictions = []
-        for r in results:
-            if hasattr(r, "boxes") and r.boxes is not None and len(r.boxes) > 0:
-                xyxy_list = r.boxes.xyxy.tolist()
-                conf_list = r.boxes.conf.tolist()
-                cls_list = r.boxes.cls.tolist()
-                for box, conf, cls in zip(xyxy_list, conf_list, cls_list):
-                    predictions.append({
-                        'bbox': [float(x) for x in box],
-                        'confidence': float(conf),
-                        'label': class_names[int(cls)]
-                    })
-
-        return jsonify({'predictions': predictions})
+        # Run prediction in memory (batched with concurrent requests);
+        # the annotated image is written only on ?save=1, named by content
+        # so concurrent uploads never overwrite each other
+        results = [batcher.predict(image)]
+
+        predictions = scale_boxes(to_predictions(results), scale)
+        prediction_cache.put(key, predictions)
+        response = {'predictions': predictions}
+        if wants_annotated():
+            os.makedirs(ANNOTATED_FOLDER, exist_ok=True)
+            response['annotated'] = f'{digest}.jpg'
+            for r in results:
+                r.save(filename=os.path.join(ANNOTATED_FOLDER, response['annotated']))
+        return jsonify(response)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -50,4 +192,4 @@ def predict():
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    app.run(host='0.0.0.0', port=5000, threaded=True)
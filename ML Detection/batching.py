@@ -0,0 +1,85 @@
+"""
+Dynamic micro-batching for model inference.
+
+Request threads submit one image each and block on a Future.  A single
+background thread takes the first waiting image, keeps collecting until it
+has max_size images or max_wait seconds have passed, runs them through
+predict_batch() as one call, and hands each result back to its caller.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    def __init__(self, predict_batch, max_size=8, max_wait=0.005, on_batch=None, on_queue=None):
+        """
+        predict_batch(list of inputs) -> list of outputs in the same order.
+        on_batch(size, seconds) is called after every batch, and
+        on_queue(depth) whenever inputs are queued or taken (for metrics).
+        """
+        self.predict_batch = predict_batch
+        self.max_size = max(1, max_size)
+        self.max_wait = max_wait
+        self.on_batch = on_batch
+        self.on_queue = on_queue
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        """Queue one input; returns a Future for its output."""
+        self._ensure_thread()
+        future = Future()
+        self._queue.put((item, future))
+        self._report_queue()
+        return future
+
+    def predict(self, item):
+        return self.submit(item).result()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _report_queue(self):
+        if self.on_queue is not None:
+            self.on_queue(self._queue.qsize())
+
+    def _ensure_thread(self):
+        # started lazily so a pre-fork server starts one per worker process
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        self._report_queue()
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            start = time.perf_counter()
+            try:
+                outputs = self.predict_batch(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                if self.on_batch is not None:
+                    self.on_batch(len(batch), time.perf_counter() - start)
+            for (_, future), output in zip(batch, outputs):
+                future.set_result(output)
@@ -0,0 +1,164 @@
+"""
+Export the detector to ONNX, optionally quantize it to INT8, and check the
+exported models against the PyTorch one.
+
+    python export_onnx.py export            # my_model/my_model.onnx
+    python export_onnx.py quantize          # my_model/my_model.int8.onnx
+    python export_onnx.py check             # accuracy / latency / size on images/
+    python export_onnx.py all
+
+check has no ground truth to work with unless --labels points at YOLO txt
+labels (one <image stem>.txt per image); otherwise the PyTorch model's
+detections are the reference, so the numbers say how much each variant
+drifts from the model app.py serves today.
+
+The ML service picks a model with MODEL_BACKEND=torch|onnx|onnx-int8.
+"""
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+MODEL_DIR = 'my_model'
+MODEL_PATHS = {
+    'torch': os.path.join(MODEL_DIR, 'my_model.pt'),
+    'onnx': os.path.join(MODEL_DIR, 'my_model.onnx'),
+    'onnx-int8': os.path.join(MODEL_DIR, 'my_model.int8.onnx'),
+}
+IMAGES = os.path.join('images', '*.jpg')
+IMGSZ = 640
+
+
+# ---------------- Export ----------------
+def export_onnx(imgsz=IMGSZ):
+    # dynamic batch axis: the service runs micro-batches
+    path = YOLO(MODEL_PATHS['torch']).export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+    if os.path.abspath(path) != os.path.abspath(MODEL_PATHS['onnx']):
+        os.replace(path, MODEL_PATHS['onnx'])
+    print(f'Wrote {MODEL_PATHS["onnx"]}')
+
+
+def quantize_int8():
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(MODEL_PATHS['onnx'], MODEL_PATHS['onnx-int8'], weight_type=QuantType.QUInt8)
+    print(f'Wrote {MODEL_PATHS["onnx-int8"]}')
+
+
+# ---------------- Accuracy check ----------------
+def detect(model, image):
+    r = model.predict(source=image, imgsz=IMGSZ, save=False, verbose=False)[0]
+    boxes = r.boxes.cpu()  # tensors live on the GPU when CUDA is in use
+    return boxes.xyxy.numpy(), boxes.conf.numpy(), boxes.cls.numpy().astype(int)
+
+
+def iou(box, boxes):
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = lambda b: (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area(box) + area(boxes) - inter, 1e-9)
+
+
+def match(pred, truth, thr=0.5):
+    """Greedy matching by confidence: (confidences, true-positive flags) of the predictions."""
+    boxes, conf, cls = pred
+    t_boxes, t_cls = truth
+    used = np.zeros(len(t_boxes), dtype=bool)
+    tp = np.zeros(len(boxes), dtype=bool)
+    for i in np.argsort(-conf):
+        if not len(t_boxes):
+            break
+        overlap = iou(boxes[i], t_boxes)
+        overlap[(t_cls != cls[i]) | used] = 0
+        j = int(np.argmax(overlap))
+        if overlap[j] >= thr:
+            used[j] = tp[i] = True
+    return conf, tp
+
+
+def average_precision(conf, tp, n_truth):
+    if n_truth == 0:
+        return float('nan')
+    order = np.argsort(-conf)
+    tp = tp[order]
+    recall = np.cumsum(tp) / n_truth
+    precision = np.cumsum(tp) / np.arange(1, len(tp) + 1)
+    # all-point interpolated area under the precision/recall curve
+    recall = np.concatenate([[0], recall, [1]])
+    precision = np.concatenate([[1], precision, [0]])
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    return float(np.sum(np.diff(recall) * precision[1:]))
+
+
+def load_labels(labels_dir, image_path, shape):
+    path = os.path.join(labels_dir, os.path.splitext(os.path.basename(image_path))[0] + '.txt')
+    if not os.path.exists(path):
+        return np.zeros((0, 4)), np.zeros(0, dtype=int)
+    rows = np.loadtxt(path, ndmin=2)
+    h, w = shape[:2]
+    cx, cy, bw, bh = rows[:, 1] * w, rows[:, 2] * h, rows[:, 3] * w, rows[:, 4] * h
+    boxes = np.column_stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2])
+    return boxes, rows[:, 0].astype(int)
+
+
+def check(backends, labels_dir=None, repeat=3):
+    paths = sorted(glob.glob(IMAGES))
+    images = [cv2.imread(p) for p in paths]
+    reference = YOLO(MODEL_PATHS['torch'])
+    if labels_dir:
+        truths = [load_labels(labels_dir, p, im.shape) for p, im in zip(paths, images)]
+        print(f'{len(paths)} image(s), ground truth from {labels_dir}')
+    else:
+        truths = [detect(reference, im)[::2] for im in images]  # (boxes, cls)
+        print(f'{len(paths)} image(s), reference = PyTorch detections')
+
+    print(f'{"backend":10} {"mAP50":>7} {"recall":>7} {"ms/img":>8} {"MB":>7}')
+    for name in backends:
+        path = MODEL_PATHS[name]
+        if not os.path.exists(path):
+            print(f'{name:10} missing {path}')
+            continue
+        model = reference if name == 'torch' else YOLO(path, task='detect')
+        detect(model, images[0])  # warm-up
+        confs, tps, seconds = [], [], []
+        for im, truth in zip(images, truths):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                pred = detect(model, im)
+            seconds.append((time.perf_counter() - start) / repeat)
+            conf, tp = match(pred, truth)
+            confs.append(conf)
+            tps.append(tp)
+        conf, tp = np.concatenate(confs), np.concatenate(tps)
+        n_truth = sum(len(t[0]) for t in truths)
+        ap = average_precision(conf, tp, n_truth)
+        recall = tp.sum() / n_truth if n_truth else float('nan')
+        print(f'{name:10} {ap:7.3f} {recall:7.3f} {1000 * np.mean(seconds):8.1f} '
+              f'{os.path.getsize(path) / 2 ** 20:7.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=['export', 'quantize', 'check', 'all'])
+    parser.add_argument('--imgsz', type=int, default=IMGSZ)
+    parser.add_argument('--labels', default=None, help='YOLO txt labels for a real mAP50')
+    parser.add_argument('--backend', action='append', choices=list(MODEL_PATHS),
+                        help='backends to check (default: all)')
+    args = parser.parse_args()
+
+    if args.command in ('export', 'all'):
+        export_onnx(args.imgsz)
+    if args.command in ('quantize', 'all'):
+        quantize_int8()
+    if args.command in ('check', 'all'):
+        check(args.backend or list(MODEL_PATHS), args.labels)
+
+
+if __name__ == '__main__':
+    main()
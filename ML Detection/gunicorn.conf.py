@@ -0,0 +1,53 @@
+# Production serving: gunicorn -c gunicorn.conf.py app:app
+#
+# The app (and the YOLO weights) are loaded once in the master before it
+# forks, so every worker shares the weight pages copy-on-write instead of
+# loading its own copy.  Each worker then gets its own slice of the cores
+# for torch's intra-op threads.
+import gc
+import os
+import tempfile
+
+CORES = os.cpu_count() or 1
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', max(1, CORES // 2)))
+# request threads per worker: enough to fill a micro-batch
+threads = int(os.environ.get('GUNICORN_THREADS', os.environ.get('BATCH_MAX_SIZE', 8)))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+preload_app = True
+
+TORCH_THREADS = int(os.environ.get('TORCH_THREADS', max(1, CORES // workers)))
+
+# Keep the master single-threaded while it loads the model: forking after an
+# OpenMP pool has started can hang the children.  Workers raise it again in
+# post_fork.
+os.environ['OMP_NUM_THREADS'] = '1'
+
+# prometheus_client multiprocess mode, so /metrics sums over all workers;
+# must be set before the app imports prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'ml-metrics'))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+for name in os.listdir(os.environ['PROMETHEUS_MULTIPROC_DIR']):
+    os.remove(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], name))
+
+
+def when_ready(server):
+    # move everything loaded so far out of the GC's reach; collections in the
+    # workers would otherwise touch (and so copy) every preloaded object
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import torch
+    torch.set_num_threads(TORCH_THREADS)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already fixed for this process
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,36 +1,226 @@
-from ultralytics import YOLO
+"""
+Headless batch predictor.
+
+Scores every image under the given paths/globs and streams one result per
+image to a single JSONL (or CSV) file.  A thread pool decodes images ahead
+of the model (JPEGs at reduced scale, straight down to about --imgsz; see
+preprocess.py), the model runs on batches, and annotated copies are only
+written with --annotate.  Boxes and sizes are in original-image pixels.
+
+    python predict_image.py                                  # images/*.jpg -> predictions.jsonl
+    python predict_image.py /archive/photos --out scores.csv --batch 32
+    python predict_image.py "images/*.jpg" --annotate runs/annotated
+    python predict_image.py /archive/photos --resume         # skip paths already in --out
+"""
+import argparse
+import csv
 import glob
+import json
 import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
+from ultralytics import YOLO
+
+from preprocess import load_for_detection, scale_boxes
+
+MODEL_PATH = os.path.join('my_model', 'my_model.pt')
+DEFAULT_SOURCE = os.path.join('images', '*.jpg')
+REPORT_EVERY = 500  # progress line every N images
+EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tif', '.tiff'}
+
+# Define class names in the same order as your training
+class_names = ["Kolam", "Rangoli"]
+
+
+# ---------------- Inputs ----------------
+def iter_images(sources):
+    """Image paths from files, directories (recursive) and glob patterns, lazily."""
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in EXTENSIONS:
+                        yield os.path.join(root, name)
+        elif os.path.isfile(source):
+            yield source
+        else:
+            yield from sorted(glob.iglob(source, recursive=True))
+
+
+def decode(path, size):
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return path, None, None
+    return (path, *load_for_detection(data, size))
+
+
+def prefetch(paths, workers, depth, size):
+    """Decoded (path, image, scale) triples in input order, with at most `depth` decodes in flight."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(decode, path, size))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------------- Outputs ----------------
+def to_predictions(result):
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return []
+    return [{'bbox': [float(x) for x in box], 'confidence': float(conf), 'label': class_names[int(cls)]}
+            for box, conf, cls in zip(boxes.xyxy.tolist(), boxes.conf.tolist(), boxes.cls.tolist())]
+
+
+class JsonlWriter:
+    def __init__(self, path, append):
+        self.f = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record):
+        self.f.write(json.dumps(record) + '\n')
+
+    def close(self):
+        self.f.close()
+
+
+class CsvWriter:
+    FIELDS = ['path', 'width', 'height', 'label', 'confidence', 'x1', 'y1', 'x2', 'y2', 'error']
+
+    def __init__(self, path, append):
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.f = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.f, fieldnames=self.FIELDS)
+        if not exists:
+            self.writer.writeheader()
+
+    def write(self, record):
+        base = {k: record.get(k, '') for k in ('path', 'width', 'height', 'error')}
+        predictions = record.get('predictions') or [{}]  # one row even with no detections
+        for p in predictions:
+            x1, y1, x2, y2 = p.get('bbox', ('', '', '', ''))
+            self.writer.writerow({**base, 'label': p.get('label', ''), 'confidence': p.get('confidence', ''),
+                                  'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2})
+
+    def close(self):
+        self.f.close()
+
+
+def drop_partial_line(path, block=1 << 16):
+    """Truncate an unfinished last line left by a run that was killed mid-write."""
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            chunk = f.read(pos - start)
+            if pos == end and chunk.endswith(b'\n'):
+                return  # last line is complete
+            cut = chunk.rfind(b'\n')
+            if cut >= 0:
+                f.truncate(start + cut + 1)
+                return
+            pos = start
+        f.truncate(0)
+
+
+def done_paths(path):
+    """Paths already scored in a previous run of the same --out file."""
+    if not os.path.exists(path):
+        return set()
+    drop_partial_line(path)
+    with open(path, encoding='utf-8') as f:
+        if path.lower().endswith('.csv'):
+            return {row['path'] for row in csv.DictReader(f)}
+        return {json.loads(line)['path'] for line in f if line.strip()}
+
+
+def annotated_path(out_dir, path):
+    """Mirror the input's path under out_dir, so same-named images from different folders don't collide."""
+    try:
+        rel = os.path.relpath(path)
+    except ValueError:  # another drive on Windows
+        rel = os.pardir
+    if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+        rel = os.path.splitdrive(os.path.abspath(path))[1].lstrip(os.sep)
+    target = os.path.join(out_dir, rel)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    return target
+
+
+# ---------------- Main loop ----------------
+def run(args):
+    model = YOLO(args.model, task='detect')
+    skip = done_paths(args.out) if args.resume else set()
+    paths = (p for p in iter_images(args.sources) if p not in skip)
+    writer = (CsvWriter if args.out.lower().endswith('.csv') else JsonlWriter)(args.out, args.resume)
+    if args.annotate:
+        os.makedirs(args.annotate, exist_ok=True)
+
+    count = 0
+    next_report = REPORT_EVERY
+    start = time.perf_counter()
+    try:
+        decoded = prefetch(paths, args.workers, args.batch * args.prefetch, args.imgsz)
+        for batch in batches(decoded, args.batch):
+            good = [item for item in batch if item[1] is not None]
+            for p, im, _ in batch:
+                if im is None:
+                    writer.write({'path': p, 'error': 'could not decode image'})
+            if good:
+                results = model.predict(source=[im for _, im, _ in good], imgsz=args.imgsz,
+                                        conf=args.conf, save=False, verbose=False)
+                for (p, im, (sx, sy)), r in zip(good, results):
+                    writer.write({'path': p, 'width': round(im.shape[1] * sx), 'height': round(im.shape[0] * sy),
+                                  'predictions': scale_boxes(to_predictions(r), (sx, sy))})
+                    if args.annotate:
+                        cv2.imwrite(annotated_path(args.annotate, p), r.plot())
+            count += len(batch)
+            if count >= next_report:
+                rate = count / (time.perf_counter() - start)
+                print(f'{count} image(s), {rate:.1f} img/s', file=sys.stderr)
+                next_report += REPORT_EVERY
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    print(f'Scored {count} image(s) in {elapsed:.1f}s -> {args.out}', file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch kolam/rangoli detection over image folders.')
+    parser.add_argument('sources', nargs='*', default=[DEFAULT_SOURCE],
+                        help=f'image files, directories or globs (default {DEFAULT_SOURCE})')
+    parser.add_argument('--model', default=MODEL_PATH, help='.pt or .onnx model')
+    parser.add_argument('--out', default='predictions.jsonl', help='.jsonl or .csv results file')
+    parser.add_argument('--batch', type=int, default=16, help='images per model call')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help='decoder threads')
+    parser.add_argument('--prefetch', type=int, default=4, help='batches decoded ahead of the model')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--conf', type=float, default=0.25, help='confidence threshold')
+    parser.add_argument('--annotate', default=None, metavar='DIR', help='also write annotated images here, mirroring the input paths')
+    parser.add_argument('--resume', action='store_true', help='append to --out, skipping scored paths')
+    run(parser.parse_args(argv))
+
 
-# Paths
-model_path = "my_model.pt"
-images_path = os.path.join("images", "*.jpg")
-
-# Load model
-model = YOLO(model_path)
-
-# Output folder
-output_project = os.path.join(os.getcwd(), "runs")
-os.makedirs(output_project, exist_ok=True)
-
-# Process each image
-for img_path in glob.glob(images_path):
-    print(f"Processing: {img_path}")
-    
-    # Predict (save annotated images and txt)
-    results = model.predict(
-        source=img_path,
-        save=True,
-        save_txt=True,
-        project=output_project,
-        name=os.path.splitext(os.path.basename(img_path))[0],  # unique folder per image
-        show=False
-    )
-    
-    # Display the image directly from the prediction
-    for r in results:
-        annotated_image = r.plot()  # returns image with boxes drawn
-        cv2.imshow("Detection", annotated_image)
-        cv2.waitKey(0)  # wait until a key is pressed
-        cv2.destroyAllWindows()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Prediction cache keyed by image content.
+
+An in-process LRU of `predictions` lists with a TTL, optionally backed by a
+SQLite file so results survive restarts and are shared between gunicorn
+workers.  The SQLite tier is capped at max_rows: the periodic sweep drops
+expired rows, then the oldest ones beyond the cap.  Keys should include the model version (see cache_key) so a new
+model never serves old answers.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(digest, model_version):
+    """Key for an image with the given content_digest()."""
+    return f'{model_version}:{digest}'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    PRUNE_INTERVAL = 60  # seconds between sweeps of expired rows, per process
+
+    def __init__(self, max_items=1024, ttl=86400, path=None, max_rows=100_000):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.path = path
+        self.max_rows = max_rows
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_pid = None
+        self._next_prune = 0
+        self.hits = 0
+        self.misses = 0
+
+    # -- persistent tier --
+    def _conn(self):
+        # one connection per process: never use a handle inherited across fork
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS predictions '
+                             '(key TEXT PRIMARY KEY, expires REAL, value TEXT)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS predictions_expires ON predictions (expires)')
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _load(self, key, now):
+        row = self._conn().execute('SELECT expires, value FROM predictions WHERE key = ?',
+                                   (key,)).fetchone()
+        if row is None or row[0] < now:
+            return None
+        return row[0], json.loads(row[1])
+
+    # -- API --
+    def get(self, key):
+        if self.max_items <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] < now:
+                del self._items[key]
+                entry = None
+            if entry is None and self.path:
+                entry = self._load(key, now)
+                if entry is not None:
+                    self._remember(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, predictions):
+        if self.max_items <= 0:
+            return
+        entry = (time.time() + self.ttl, predictions)
+        with self._lock:
+            self._remember(key, entry)
+            if self.path:
+                db = self._conn()
+                db.execute('INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)',
+                           (key, entry[0], json.dumps(predictions)))
+                now = time.time()
+                if now >= self._next_prune:
+                    self._prune(db, now)
+                    self._next_prune = now + self.PRUNE_INTERVAL
+                db.commit()
+
+    def _prune(self, db, now):
+        db.execute('DELETE FROM predictions WHERE expires < ?', (now,))
+        # every row has the same TTL, so the earliest expiry is the oldest write
+        excess = db.execute('SELECT COUNT(*) FROM predictions').fetchone()[0] - self.max_rows
+        if excess > 0:
+            db.execute('DELETE FROM predictions WHERE key IN '
+                       '(SELECT key FROM predictions ORDER BY expires LIMIT ?)', (excess,))
+
+    def _remember(self, key, entry):
+        self._items[key] = entry
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'items': len(self._items)}
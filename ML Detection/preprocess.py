@@ -0,0 +1,99 @@
+"""
+Decode-time downscaling for detection.
+
+YOLO letterboxes every input to 640 px anyway, so decoding a 4000 px scan at
+full resolution only costs time and memory.  JPEGs are decoded with Pillow's
+draft mode, which lets libjpeg scale by 1/2, 1/4 or 1/8 while decoding; the
+remainder (and any non-JPEG) is area-resized with OpenCV so the long side
+lands on the model size.  Boxes found on the small image are mapped back to
+original-image coordinates with scale_boxes().
+"""
+import io
+import math
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+DETECT_SIZE = 640
+PREPROCESS_VERSION = '1'  # bump when decoding/resizing changes, so cached predictions expire
+
+# EXIF orientations that swap width and height
+_TRANSPOSED = {5, 6, 7, 8}
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only file over any bytes-like object (BytesIO would copy a bytearray)."""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast('B')
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+def _decode_reduced(data, target):
+    """Pillow decode, JPEG-reduced toward target; (BGR array, original size) or (None, None)."""
+    try:
+        img = Image.open(_BufferReader(data))
+        w, h = img.size
+        orig = (h, w) if img.getexif().get(0x0112, 1) in _TRANSPOSED else (w, h)
+        if img.format == 'JPEG' and max(w, h) > target:
+            ratio = target / max(w, h)
+            # draft picks the largest 1/2, 1/4, 1/8 reduction still >= this size
+            img.draft('RGB', (math.ceil(w * ratio), math.ceil(h * ratio)))
+        img = ImageOps.exif_transpose(img).convert('RGB')
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None, None
+    return np.asarray(img)[:, :, ::-1], orig  # RGB -> BGR
+
+
+def load_for_detection(data, target=DETECT_SIZE):
+    """
+    Encoded image bytes (any bytes-like object; it is not copied) ->
+    (BGR array with long side <= target, (sx, sy)), or
+    (None, None) if the bytes are not an image.  Multiplying x by sx and y by
+    sy maps the array's pixel coordinates back onto the original image.
+    """
+    array, orig = _decode_reduced(data, target)
+    if array is None:
+        # formats Pillow can't read: full-size OpenCV decode
+        array = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if array is None:
+            return None, None
+        orig = (array.shape[1], array.shape[0])
+
+    height, width = array.shape[:2]
+    if max(width, height) > target:
+        ratio = target / max(width, height)
+        size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+        array = cv2.resize(array, size, interpolation=cv2.INTER_AREA)
+        height, width = array.shape[:2]
+    return np.ascontiguousarray(array), (orig[0] / width, orig[1] / height)
+
+
+def scale_boxes(predictions, scale):
+    """Map predictions from the downscaled image back to original coordinates."""
+    sx, sy = scale
+    if sx == 1 and sy == 1:
+        return predictions
+    return [{**p, 'bbox': [p['bbox'][0] * sx, p['bbox'][1] * sy, p['bbox'][2] * sx, p['bbox'][3] * sy]}
+            for p in predictions]
@@ -1,10 +1,11 @@
 import turtle
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image
 import math
 import random
 
+from kolam_raster import rasterize_canvas, save_image
+
 # ---------------- Screen & Turtle ----------------
 screen = turtle.Screen()
 screen.title("Kolam Generator")
@@ -200,49 +201,49 @@ def save_as_image():
     if not file_path:
         return
     try:
-        canvas = screen.getcanvas()
-        canvas.postscript(file="temp.eps", colormode="color")
-        img = Image.open("temp.eps")
-        if file_path.lower().endswith(".jpg"):
-            img = img.convert("RGB")
-        img.save(file_path, dpi=(300, 300))
+        img = rasterize_canvas(screen.getcanvas(), dpi=300)
+        save_image(img, file_path, dpi=300)
         messagebox.showinfo("Saved", f"✅ Kolam saved at {file_path}")
     except Exception as e:
         messagebox.showerror("Error", f"Saving failed.\n{e}")
 
 # ---------------- Tk GUI ----------------
-root = tk.Tk()
-root.title("Kolam Generator GUI")
-root.geometry("380x320")
+def main():
+    root = tk.Tk()
+    root.title("Kolam Generator GUI")
+    root.geometry("380x320")
 
-tk.Label(root, text="Rows:").grid(row=0, column=0, pady=6, sticky="e")
-rows_entry = tk.Entry(root); rows_entry.insert(0, "5"); rows_entry.grid(row=0, column=1)
+    tk.Label(root, text="Rows:").grid(row=0, column=0, pady=6, sticky="e")
+    rows_entry = tk.Entry(root); rows_entry.insert(0, "5"); rows_entry.grid(row=0, column=1)
 
-tk.Label(root, text="Cols:").grid(row=1, column=0, pady=6, sticky="e")
-cols_entry = tk.Entry(root); cols_entry.insert(0, "5"); cols_entry.grid(row=1, column=1)
+    tk.Label(root, text="Cols:").grid(row=1, column=0, pady=6, sticky="e")
+    cols_entry = tk.Entry(root); cols_entry.insert(0, "5"); cols_entry.grid(row=1, column=1)
 
-tk.Label(root, text="Spacing:").grid(row=2, column=0, pady=6, sticky="e")
-spacing_entry = tk.Entry(root); spacing_entry.insert(0, "60"); spacing_entry.grid(row=2, column=1)
+    tk.Label(root, text="Spacing:").grid(row=2, column=0, pady=6, sticky="e")
+    spacing_entry = tk.Entry(root); spacing_entry.insert(0, "60"); spacing_entry.grid(row=2, column=1)
 
-tk.Label(root, text="Pattern:").grid(row=3, column=0, pady=6, sticky="e")
-pattern_var = tk.StringVar(value="Cell Loops (2×2)")
-pattern_menu = ttk.Combobox(
-    root, textvariable=pattern_var,
-    values=list(PATTERNS.keys()), state="readonly", width=28
-)
-pattern_menu.grid(row=3, column=1)
+    tk.Label(root, text="Pattern:").grid(row=3, column=0, pady=6, sticky="e")
+    pattern_var = tk.StringVar(value="Cell Loops (2×2)")
+    pattern_menu = ttk.Combobox(
+        root, textvariable=pattern_var,
+        values=list(PATTERNS.keys()), state="readonly", width=28
+    )
+    pattern_menu.grid(row=3, column=1)
 
-def run_drawing():
-    try:
-        rows = max(2, int(rows_entry.get()))
-        cols = max(2, int(cols_entry.get()))
-        spacing = max(20, int(spacing_entry.get()))
-    except Exception:
-        messagebox.showerror("Input error", "Rows/Cols/Spacing must be integers.")
-        return
-    draw_pattern(pattern_menu.get(), rows, cols, spacing)
+    def run_drawing():
+        try:
+            rows = max(2, int(rows_entry.get()))
+            cols = max(2, int(cols_entry.get()))
+            spacing = max(20, int(spacing_entry.get()))
+        except Exception:
+            messagebox.showerror("Input error", "Rows/Cols/Spacing must be integers.")
+            return
+        draw_pattern(pattern_menu.get(), rows, cols, spacing)
+
+    tk.Button(root, text="Draw Kolam", command=run_drawing, bg="#cfe8ff").grid(row=4, column=0, columnspan=2, pady=12)
+    tk.Button(root, text="Save Kolam", command=save_as_image, bg="#c8f7c5").grid(row=5, column=0, columnspan=2, pady=4)
 
-tk.Button(root, text="Draw Kolam", command=run_drawing, bg="#cfe8ff").grid(row=4, column=0, columnspan=2, pady=12)
-tk.Button(root, text="Save Kolam", command=save_as_image, bg="#c8f7c5").grid(row=5, column=0, columnspan=2, pady=4)
+    root.mainloop()
 
-root.mainloop()
+if __name__ == "__main__":
+    main()
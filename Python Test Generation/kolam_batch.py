@@ -0,0 +1,135 @@
+# kolam_batch.py
+"""
+Unattended catalogue builds: render every combination of pattern, grid size,
+spacing and colour across all cores.
+
+    python kolam_batch.py "Petal Grid" --rows 5-25:2 --spacing 40,48,60 \
+        --color white --color gold --out catalogue/
+    python kolam_batch.py all --rows 7 --format svg --out svgs/
+
+Pattern names are the PATTERNS keys of kolam_master.py (rendered headless
+through kolam_geometry, so no Tk display is needed).
+"""
+import argparse
+import itertools
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import kolam_geometry as geometry
+
+EXTENSIONS = {"png": ".png", "svg": ".svg"}
+
+# ---------------- Argument helpers ----------------
+def parse_range(spec):
+    """'7' -> [7], '5,7,9' -> [5, 7, 9], '5-15' -> 5..15, '5-15:2' -> 5, 7, .., 15."""
+    values = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        m = re.fullmatch(r"(\d+)-(\d+)(?::(\d+))?", part)
+        if m:
+            lo, hi, step = int(m.group(1)), int(m.group(2)), int(m.group(3) or 1)
+            values.extend(range(lo, hi + 1, step))
+        elif part:
+            values.append(int(part))
+    return values
+
+def pattern_names():
+    """kolam_master.PATTERNS keys; the module is imported on kolam_turtle, so no Tk window opens."""
+    import kolam_turtle
+    kolam_turtle.install()
+    import kolam_master
+    return list(kolam_master.PATTERNS)
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-")
+
+def output_name(name, rows, cols, spacing, color, fmt):
+    parts = [slug(name), f"{rows}x{cols}", f"s{spacing}"]
+    if color:
+        parts.append(slug(color))
+    return "_".join(parts) + EXTENSIONS[fmt]
+
+# ---------------- Worker ----------------
+def render_job(job):
+    """Runs in a pool worker: build, render and write one design."""
+    name, rows, cols, spacing, color, background, fmt, dpi, out_dir = job
+    kolam = geometry.build(name, rows, cols, spacing, color=color, background=background)
+    if fmt == "svg":
+        data = geometry.render_svg(kolam).encode("utf-8")
+    else:
+        data = geometry.render_png(kolam, dpi)
+    path = os.path.join(out_dir, output_name(name, rows, cols, spacing, color, fmt))
+    with open(path, "wb") as f:
+        f.write(data)
+    return path, kolam.primitive_count()
+
+def make_jobs(names, grids, spacings, colors, background, fmt, dpi, out_dir):
+    for name, (rows, cols), spacing, color in itertools.product(names, grids, spacings, colors):
+        yield (name, rows, cols, spacing, color, background, fmt, dpi, out_dir)
+
+# ---------------- CLI ----------------
+def build_parser():
+    p = argparse.ArgumentParser(description="Batch-render kolam_master patterns in parallel.")
+    p.add_argument("pattern", nargs="*",
+                   help='pattern name(s) from kolam_master.PATTERNS (see --list), or "all"')
+    p.add_argument("--rows", default="7", help="dot rows: 7 | 5,7,9 | 5-15[:step] (default 7)")
+    p.add_argument("--cols", default=None, help="dot cols, same syntax (default: same as rows)")
+    p.add_argument("--spacing", default="48", help="dot spacing in px, same syntax (default 48)")
+    p.add_argument("--color", action="append", default=None,
+                   help="stroke colour, repeatable (default: the pattern's own colour)")
+    p.add_argument("--background", default="black")
+    p.add_argument("--format", choices=sorted(EXTENSIONS), default="png")
+    p.add_argument("--dpi", type=int, default=96, help="PNG resolution (96 = 1 px per turtle px)")
+    p.add_argument("--out", default="kolam_output", help="output directory")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--chunksize", type=int, default=16, help="jobs handed to a worker at a time")
+    p.add_argument("--list", action="store_true", help="print the pattern names and exit")
+    return p
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    patterns = pattern_names()
+    if args.list:
+        print("\n".join(patterns))
+        return 0
+    if not args.pattern:
+        parser.error('at least one pattern (or "all") is required unless --list is given')
+
+    names = patterns if args.pattern == ["all"] else args.pattern
+    unknown = [n for n in names if n not in patterns]
+    if unknown:
+        print(f"Unknown pattern(s): {', '.join(unknown)}. Use --list to see the names.", file=sys.stderr)
+        return 2
+
+    rows_list = parse_range(args.rows)
+    if args.cols:
+        grids = list(itertools.product(rows_list, parse_range(args.cols)))
+    else:
+        grids = [(r, r) for r in rows_list]  # square grids by default
+    spacings = parse_range(args.spacing)
+    colors = args.color or [None]
+    os.makedirs(args.out, exist_ok=True)
+
+    jobs = list(make_jobs(names, grids, spacings, colors, args.background, args.format, args.dpi, args.out))
+
+    total = len(jobs)
+    print(f"Rendering {total} design(s) with {args.workers} worker(s) -> {args.out}")
+    start = time.perf_counter()
+    done = primitives = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for _, count in pool.map(render_job, jobs, chunksize=max(1, args.chunksize)):
+            done += 1
+            primitives += count
+            if done % 500 == 0 or done == total:
+                print(f"  {done}/{total}")
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed * 60 if elapsed else float("inf")
+    print(f"Done: {done} design(s), {primitives} primitives in {elapsed:.1f}s ({rate:.0f} designs/min)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
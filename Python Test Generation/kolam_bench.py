@@ -0,0 +1,249 @@
+# kolam_bench.py
+"""
+Benchmarks for the kolam generators.
+
+Suites
+    master  every PATTERNS entry of kolam_master.py (draw_pattern, headless)
+    kolam1  every PATTERNS entry of kolam1.py (draw_pattern, headless)
+    mpl     kolamex3.generate_kolam(n) and the fixed-size kolamtry5 designs
+            (needs matplotlib; run on the Agg backend)
+
+The turtle scripts run on kolam_turtle, so what is timed is the drawing code
+itself, not Tk animation.  For each (suite, pattern, size) the best wall time
+of --repeat runs, the primitives emitted and the tracemalloc peak of one
+extra run are written to a JSON file.
+
+    python kolam_bench.py --out bench.json
+    python kolam_bench.py --suite master --sizes 5,25,101 --out new.json --compare bench.json
+    python kolam_bench.py --results new.json --compare bench.json     # compare only
+
+With --compare, the exit status is 1 when any case got slower than the
+baseline by more than --threshold.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+import kolam_turtle
+from kolam_batch import parse_range
+
+DEFAULT_SIZES = "5,11,25,51,101,201"
+SUITES = ("master", "kolam1", "mpl")
+
+# the dragon-curve string of "Single Loop" doubles with every row/col
+MAX_SIZE = {
+    ("kolam1", "Single Loop (L-system)"): 9,
+}
+
+# ---------------- Cases ----------------
+class Case:
+    """One benchmarked generator; run(size) draws and returns the primitive count."""
+
+    def __init__(self, suite, pattern, run, sizes=True):
+        self.suite = suite
+        self.pattern = pattern
+        self.run = run
+        self.sizes = sizes  # False: the generator has a fixed size
+
+def _turtle_cases(suite, module_name):
+    kolam_turtle.install()
+    module = __import__(module_name)
+
+    def make(name):
+        def run(size):
+            module.draw_pattern(name, size, size, 48)
+            # the module's own pen: every script shares the one Screen()
+            return sum(layer.primitive_count() for layer in module.pen.layers())
+        return run
+
+    return [Case(suite, name, make(name)) for name in module.PATTERNS]
+
+def _mpl_artists(plt):
+    count = 0
+    for num in plt.get_fignums():
+        for ax in plt.figure(num).axes:
+            count += len(ax.lines) + len(ax.patches) + len(ax.collections)
+    plt.close("all")
+    return count
+
+def _mpl_cases():
+    try:
+        import matplotlib
+    except ImportError:
+        return []
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import kolamex3
+    import kolamtry5
+
+    def ex3(size):
+        kolamex3.generate_kolam(size)
+        return _mpl_artists(plt)
+
+    def fixed(func):
+        def run(size):
+            with tempfile.TemporaryDirectory() as tmp, _chdir(tmp):
+                func()  # writes its PNG into the cwd
+            return _mpl_artists(plt)
+        return run
+
+    cases = [Case("mpl", "kolamex3.generate_kolam", ex3)]
+    for func in (kolamtry5.generate_lotus_kolam, kolamtry5.generate_geometric_kolam,
+                 kolamtry5.generate_flower_chain_kolam, kolamtry5.generate_spiral_kolam):
+        cases.append(Case("mpl", "kolamtry5." + func.__name__, fixed(func), sizes=False))
+    return cases
+
+@contextlib.contextmanager
+def _chdir(path):
+    old = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(old)
+
+def load_cases(suites):
+    cases = []
+    if "master" in suites:
+        cases += _turtle_cases("master", "kolam_master")
+    if "kolam1" in suites:
+        cases += _turtle_cases("kolam1", "kolam1")
+    if "mpl" in suites:
+        mpl = _mpl_cases()
+        if not mpl:
+            print("mpl suite skipped: matplotlib is not installed", file=sys.stderr)
+        cases += mpl
+    return cases
+
+# ---------------- Measuring ----------------
+def measure(case, size, repeat=3):
+    """Best-of-repeat wall time, primitives and peak traced memory for one size."""
+    best = float("inf")
+    primitives = 0
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        start = time.perf_counter()
+        primitives = case.run(size)
+        best = min(best, time.perf_counter() - start)
+    # separate run: tracemalloc slows allocation-heavy code down a lot
+    gc.collect()
+    tracemalloc.start()
+    case.run(size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"suite": case.suite, "pattern": case.pattern,
+            "size": size if case.sizes else None,
+            "seconds": round(best, 6), "primitives": int(primitives), "peak_bytes": int(peak)}
+
+def run_benchmarks(cases, sizes, repeat=3, log=print):
+    results = []
+    for case in cases:
+        limit = MAX_SIZE.get((case.suite, case.pattern))
+        for size in (sizes if case.sizes else [None]):
+            if limit is not None and size > limit:
+                continue
+            r = measure(case, size, repeat)
+            results.append(r)
+            log(f"{r['suite']:7} {r['pattern']:36} {_size_label(size):>9} "
+                f"{r['seconds'] * 1000:10.1f} ms {r['primitives']:9d} prims "
+                f"{r['peak_bytes'] / 2 ** 20:8.1f} MiB")
+    return results
+
+def _size_label(size):
+    return "fixed" if size is None else f"{size}x{size}"
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+# ---------------- Comparison ----------------
+def _key(r):
+    return r["suite"], r["pattern"], r["size"]
+
+def compare(baseline, current, threshold=0.25, min_seconds=0.005):
+    """
+    Rows of (key, old, new, ratio, regressed) for cases present in both runs.
+    A case regresses when it is more than `threshold` slower and the
+    difference is above `min_seconds` (so timer noise on tiny cases is ignored).
+    """
+    old = {_key(r): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        base = old.get(_key(r))
+        if base is None:
+            continue
+        ratio = r["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+        regressed = ratio > 1 + threshold and r["seconds"] - base["seconds"] > min_seconds
+        rows.append((_key(r), base, r, ratio, regressed))
+    return rows
+
+def print_comparison(rows, threshold):
+    for (suite, pattern, size), base, new, ratio, regressed in rows:
+        flag = "  SLOWER" if regressed else ""
+        print(f"{suite:7} {pattern:36} {_size_label(size):>9} "
+              f"{base['seconds'] * 1000:10.1f} -> {new['seconds'] * 1000:10.1f} ms "
+              f"x{ratio:5.2f}{flag}")
+    slower = sum(1 for row in rows if row[-1])
+    print(f"{len(rows)} case(s) compared, {slower} slower than +{threshold:.0%}")
+    return slower
+
+# ---------------- CLI ----------------
+def build_parser():
+    p = argparse.ArgumentParser(description="Benchmark the kolam generators.")
+    p.add_argument("--suite", action="append", choices=SUITES,
+                   help="suite to run, repeatable (default: all)")
+    p.add_argument("--pattern", action="append", default=None,
+                   help="only patterns whose name contains this text, repeatable")
+    p.add_argument("--sizes", default=DEFAULT_SIZES,
+                   help=f"square grid sizes: 7 | 5,7,9 | 5-15[:step] (default {DEFAULT_SIZES})")
+    p.add_argument("--repeat", type=int, default=3, help="timed runs per case; the best is kept")
+    p.add_argument("--out", default="kolam_bench.json", help="results file to write")
+    p.add_argument("--results", default=None,
+                   help="compare this existing results file instead of running")
+    p.add_argument("--compare", default=None, metavar="BASELINE",
+                   help="baseline results file to compare against")
+    p.add_argument("--threshold", type=float, default=0.25,
+                   help="allowed slowdown before a case counts as a regression (default 0.25)")
+    return p
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.results:
+        with open(args.results, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        cases = load_cases(args.suite or SUITES)
+        if args.pattern:
+            cases = [c for c in cases if any(p.lower() in c.pattern.lower() for p in args.pattern)]
+        results = run_benchmarks(cases, parse_range(args.sizes), args.repeat)
+        current = {"environment": environment(), "repeat": args.repeat, "results": results}
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Wrote {len(results)} result(s) to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if print_comparison(compare(baseline, current, args.threshold), args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
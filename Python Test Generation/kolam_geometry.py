@@ -0,0 +1,451 @@
+# kolam_geometry.py
+"""
+Headless geometry for the kolam_master.py patterns.
+
+Every pattern here returns NumPy arrays (polylines + arcs) instead of moving
+the global turtle pen, so designs can be built without a Tk display and then
+handed to any renderer in RENDERERS (turtle, svg, ...).
+"""
+import math
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+DOT_SIZE = 6
+MARGIN = 130  # kolam_master.reset_canvas pads the grid by 260 px
+
+# ---------------- Containers ----------------
+class Strokes:
+    """
+    One colour layer of a design.
+
+    points  : (P, 2) float array, every polyline vertex back to back
+    offsets : (L + 1,) int array, polyline i is points[offsets[i]:offsets[i+1]]
+    arcs    : (A, 5) float array of (cx, cy, radius, start_deg, sweep_deg),
+              sweep > 0 is counter-clockwise like turtle.circle(+r)
+    dots    : (D, 3) float array of (x, y, diameter), like turtle.dot()
+    fill    : True for a filled layer: every polyline is a closed polygon
+              painted in color with no outline (turtle begin_fill/end_fill)
+    """
+
+    def __init__(self, points=None, offsets=None, arcs=None, color="white", width=2, dots=None, fill=False):
+        self.points = np.zeros((0, 2)) if points is None else np.asarray(points, dtype=float).reshape(-1, 2)
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else np.asarray(offsets, dtype=np.int64)
+        self.arcs = np.zeros((0, 5)) if arcs is None else np.asarray(arcs, dtype=float).reshape(-1, 5)
+        self.dots = np.zeros((0, 3)) if dots is None else np.asarray(dots, dtype=float).reshape(-1, 3)
+        self.color = color
+        self.width = width
+        self.fill = fill
+
+    def polylines(self):
+        return [self.points[a:b] for a, b in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def primitive_count(self):
+        return len(self.offsets) - 1 + len(self.arcs) + len(self.dots)
+
+    def is_empty(self):
+        return self.primitive_count() == 0
+
+class Kolam:
+    """A full design: dot grid + stroke layers + canvas settings."""
+
+    def __init__(self, rows, cols, spacing, dots, layers, dot_color="white",
+                 background="black", dot_size=DOT_SIZE, margin=MARGIN, size=None):
+        self.rows = rows
+        self.cols = cols
+        self.spacing = spacing
+        self.dots = dots
+        self.layers = layers
+        self.dot_color = dot_color
+        self.background = background
+        self.dot_size = dot_size
+        self.margin = margin
+        self.size = size
+
+    def canvas_size(self):
+        """(width, height) in turtle pixels, same as kolam_master.reset_canvas."""
+        if self.size is not None:
+            return self.size
+        w = int((self.cols - 1) * self.spacing + 2 * self.margin)
+        h = int((self.rows - 1) * self.spacing + 2 * self.margin)
+        return w, h
+
+    def primitive_count(self):
+        return len(self.dots) + sum(layer.primitive_count() for layer in self.layers)
+
+# ---------------- Turtle-style cursor ----------------
+class Cursor:
+    """
+    Records turtle moves (goto / forward / circle ...) as geometry.
+    circle() is computed analytically, so one call is one arc row.
+    """
+
+    def __init__(self, x=0.0, y=0.0, heading=0.0):
+        self.x, self.y = float(x), float(y)
+        self._heading = float(heading)
+        self._down = True
+        self._points = []
+        self._offsets = [0]
+        self._line = None
+        self._arcs = []
+        self._dots = []
+
+    # -- state --
+    def penup(self):
+        self._flush()
+        self._down = False
+
+    def pendown(self):
+        self._down = True
+
+    def setheading(self, angle):
+        self._heading = float(angle) % 360
+
+    def left(self, angle):
+        self._heading = (self._heading + angle) % 360
+
+    def right(self, angle):
+        self._heading = (self._heading - angle) % 360
+
+    def heading(self):
+        return self._heading
+
+    def xcor(self):
+        return self.x
+
+    def ycor(self):
+        return self.y
+
+    def position(self):
+        return self.x, self.y
+
+    # -- movement --
+    def goto(self, x, y):
+        if self._down:
+            if self._line is None:
+                self._line = [(self.x, self.y)]
+            self._line.append((float(x), float(y)))
+        self.x, self.y = float(x), float(y)
+
+    def forward(self, distance):
+        rad = math.radians(self._heading)
+        self.goto(self.x + distance * math.cos(rad), self.y + distance * math.sin(rad))
+
+    def circle(self, radius, extent=None):
+        """Same contract as turtle.circle: centre is radius units to the left."""
+        if extent is None:
+            extent = 360.0
+        rad = math.radians(self._heading)
+        cx = self.x - radius * math.sin(rad)
+        cy = self.y + radius * math.cos(rad)
+        sweep = extent if radius >= 0 else -extent
+        start = self._heading - 90 if radius >= 0 else self._heading + 90
+        end = math.radians(start + sweep)
+        r = abs(radius)
+        if r > 0 and self._down:
+            self._flush()
+            self._arcs.append((cx, cy, r, start, sweep))
+        self.x, self.y = cx + r * math.cos(end), cy + r * math.sin(end)
+        self._heading = (self._heading + sweep) % 360
+
+    def dot(self, size):
+        """Dot of diameter size at the current position (pen state ignored, as in turtle)."""
+        self._dots.append((self.x, self.y, size))
+
+    # -- output --
+    def _flush(self):
+        if self._line is not None and len(self._line) > 1:
+            self._points.extend(self._line)
+            self._offsets.append(len(self._points))
+        self._line = None
+
+    def strokes(self, color="white", width=2):
+        self._flush()
+        return Strokes(self._points, self._offsets, self._arcs, color, width, self._dots)
+
+    def drain(self, color="white", width=2):
+        """strokes() then forget them; the position, heading and pen state are kept."""
+        out = self.strokes(color, width)
+        self._points, self._offsets, self._arcs, self._dots = [], [0], [], []
+        return out
+
+# ---------------- Array helpers ----------------
+def dot_centers(rows, cols, spacing, ox, oy):
+    """(rows*cols, 2) dot coordinates in the same row-major order as the loops."""
+    c, r = np.meshgrid(np.arange(cols), np.arange(rows))
+    return np.column_stack([ox + c.ravel() * spacing, oy - r.ravel() * spacing]).astype(float)
+
+def cell_centers(rows, cols, spacing, ox, oy):
+    """Centres of every 2x2 dot cell."""
+    if rows < 2 or cols < 2:
+        return np.zeros((0, 2))
+    return dot_centers(rows - 1, cols - 1, spacing, ox + spacing / 2, oy - spacing / 2)
+
+def stamp(template, centers):
+    """Copy a template drawn around (0, 0) to every centre in one broadcast."""
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    n = len(centers)
+    npts = len(template.points)
+    points = (template.points[None, :, :] + centers[:, None, :]).reshape(-1, 2)
+    starts = (template.offsets[:-1][None, :] + (np.arange(n) * npts)[:, None]).ravel()
+    offsets = np.append(starts, n * npts).astype(np.int64)
+    arcs = np.repeat(template.arcs[None, :, :], n, axis=0)
+    arcs[:, :, :2] += centers[:, None, :]
+    dots = np.repeat(template.dots[None, :, :], n, axis=0)
+    dots[:, :, :2] += centers[:, None, :]
+    return Strokes(points, offsets, arcs.reshape(-1, 5), template.color, template.width, dots.reshape(-1, 3),
+                   template.fill)
+
+def concat(layers, color=None, width=None):
+    """Merge several Strokes into one layer."""
+    points = np.concatenate([s.points for s in layers]) if layers else None
+    offsets = [0]
+    for s in layers:
+        offsets.extend(s.offsets[1:] + offsets[-1])
+    arcs = np.concatenate([s.arcs for s in layers]) if layers else None
+    dots = np.concatenate([s.dots for s in layers]) if layers else None
+    first = layers[0] if layers else Strokes()
+    return Strokes(points, offsets, arcs,
+                   first.color if color is None else color,
+                   first.width if width is None else width, dots, first.fill)
+
+def arc_points(arcs, segments=32):
+    """Tessellate (A, 5) arcs into an (A, segments + 1, 2) array of vertices."""
+    arcs = np.asarray(arcs, dtype=float).reshape(-1, 5)
+    t = np.linspace(0.0, 1.0, segments + 1)
+    ang = np.radians(arcs[:, 3:4] + arcs[:, 4:5] * t)
+    x = arcs[:, 0:1] + arcs[:, 2:3] * np.cos(ang)
+    y = arcs[:, 1:2] + arcs[:, 2:3] * np.sin(ang)
+    return np.stack([x, y], axis=-1)
+
+def _diamond(half):
+    return np.array([[-half, 0.0], [0.0, half], [half, 0.0], [0.0, -half], [-half, 0.0]])
+
+# ---------------- Kolam patterns (dot-grid based) ----------------
+def simple_diamond(rows, cols, spacing, ox, oy, color="white"):
+    """Classic diamond around each dot."""
+    tpl = Strokes(_diamond(spacing / 2.2), [0, 5], color=color)
+    return stamp(tpl, dot_centers(rows, cols, spacing, ox, oy))
+
+def diamond_star(rows, cols, spacing, ox, oy, color="cyan"):
+    """Diamond plus diagonal star connections."""
+    half = spacing / 2.2
+    d = half * 0.7
+    pts = np.vstack([_diamond(half), [[-d, -d], [d, d]], [[-d, d], [d, -d]]])
+    tpl = Strokes(pts, [0, 5, 7, 9], color=color)
+    return stamp(tpl, dot_centers(rows, cols, spacing, ox, oy))
+
+def multi_layer_diamond(rows, cols, spacing, ox, oy, color="gold"):
+    """Three concentric diamonds around each dot."""
+    pts = np.vstack([_diamond(spacing * s) for s in (0.5, 0.33, 0.18)])
+    tpl = Strokes(pts, [0, 5, 10, 15], color=color)
+    return stamp(tpl, dot_centers(rows, cols, spacing, ox, oy))
+
+def maze_diamond(rows, cols, spacing, ox, oy, color="lightgreen"):
+    """Semicircle loop stamped on each 2x2 cell."""
+    r = spacing / 2.0
+    pen = Cursor(-r, 0)
+    for _ in range(4):
+        pen.circle(r, 180)
+        pen.right(90)
+    return stamp(pen.strokes(color), cell_centers(rows, cols, spacing, ox, oy))
+
+def lotus_center(rows, cols, spacing, ox, oy, color="magenta"):
+    """Centered lotus on the middle dot (best if grid odd)."""
+    if rows < 3 or cols < 3:
+        return Strokes(color=color)
+    cx = ox + ((cols - 1) // 2) * spacing
+    cy = oy - ((rows - 1) // 2) * spacing
+    r = spacing * 0.9
+    petals = 8
+    pen = Cursor(cx, cy - r / 2)
+    for _ in range(petals):
+        pen.circle(r / 2, 120)
+        pen.left(180 - 120)
+        pen.circle(r / 2, 120)
+        pen.left(180 - 360 / petals)
+    pen.penup(); pen.goto(cx, cy - r / 6); pen.pendown(); pen.circle(r / 6)
+    return pen.strokes(color)
+
+def petal_grid(rows, cols, spacing, ox, oy, color="orange"):
+    """Four petal arcs around every dot."""
+    rp = spacing / 2.5
+    pen = Cursor()
+    for angle in (0, 90, 180, 270):
+        pen.penup(); pen.goto(0, 0); pen.setheading(angle); pen.forward(rp)
+        pen.pendown(); pen.circle(rp, 180)
+    return stamp(pen.strokes(color), dot_centers(rows, cols, spacing, ox, oy))
+
+def infinity_cells(rows, cols, spacing, ox, oy, color="purple"):
+    """Figure-8 loop in each 2x2 cell."""
+    r = spacing / 2.3
+    pen = Cursor(-r, 0)
+    pen.circle(r, 180)
+    pen.circle(-r, 180)
+    return stamp(pen.strokes(color), cell_centers(rows, cols, spacing, ox, oy))
+
+def concentric_loops(rows, cols, spacing, ox, oy, color="lightblue"):
+    """Concentric rings around the grid centre."""
+    midx = ox + (cols - 1) * spacing / 2
+    midy = oy - (rows - 1) * spacing / 2
+    maxr = min(cols, rows) * spacing / 1.75
+    steps = int(min(cols, rows) / 1.0) + 1
+    radii = maxr * np.arange(1, steps) / steps
+    arcs = np.column_stack([np.full_like(radii, midx), np.full_like(radii, midy),
+                            radii, np.full_like(radii, -90.0), np.full_like(radii, 360.0)])
+    return Strokes(arcs=arcs, color=color)
+
+def neli_snake(rows, cols, spacing, ox, oy, color="green"):
+    """Serpentine snake weaving across rows."""
+    r = spacing / 2.2
+    start_x = ox - spacing / 2
+    pen = Cursor()
+    for i in range(rows):
+        y = oy - i * spacing
+        pen.penup(); pen.goto(start_x, y); pen.setheading(0); pen.pendown()
+        for _ in range(cols - 1):
+            pen.circle(r if i % 2 == 0 else -r, 180)
+            pen.forward(spacing / 10)
+        if i < rows - 1:
+            pen.penup(); pen.goto(pen.xcor(), y - spacing / 2); pen.pendown()
+            pen.circle(r if i % 2 == 0 else -r, 180)
+    return pen.strokes(color)
+
+# extra older ones (kolam_best.py)
+def square(rows, cols, spacing, ox, oy, color="white"):
+    """Half-spacing square hanging off each dot."""
+    pen = Cursor()
+    for _ in range(4):
+        pen.forward(spacing / 2)
+        pen.right(90)
+    return stamp(pen.strokes(color), dot_centers(rows, cols, spacing, ox, oy))
+
+def spiral(rows, cols, spacing, ox, oy, color="white"):
+    """Growing quarter-arc spiral from the centre."""
+    pen = Cursor()
+    for i in range(80):
+        pen.circle(i * 2, 90)
+    return pen.strokes(color)
+
+def star(rows, cols, spacing, ox, oy, color="white"):
+    """36-point star burst from the centre."""
+    pen = Cursor()
+    size = spacing * 3
+    for _ in range(36):
+        pen.forward(size)
+        pen.right(170)
+    return pen.strokes(color)
+
+# ---------------- Patterns dictionary ----------------
+PATTERNS = {
+    "Simple Diamond":            simple_diamond,
+    "Diamond + Star":            diamond_star,
+    "Multi-Layer Diamond":       multi_layer_diamond,
+    "Maze Diamond":              maze_diamond,
+    "Lotus (center)":            lotus_center,
+    "Petal Grid":                petal_grid,
+    "Infinity Cells":            infinity_cells,
+    "Concentric Loops":          concentric_loops,
+    "Neli Snake (serpentine)":   neli_snake,
+    "Square Kolam":              square,
+    "Spiral Kolam":              spiral,
+    "Star Kolam":                star,
+}
+
+def grid_offsets(rows, cols, spacing):
+    ox = -((cols - 1) * spacing) / 2
+    oy = ((rows - 1) * spacing) / 2
+    return ox, oy
+
+def build(name, rows, cols, spacing, color=None, dot_color="white", background="black"):
+    """Geometry for PATTERNS[name] on a centred rows x cols dot grid."""
+    ox, oy = grid_offsets(rows, cols, spacing)
+    func = PATTERNS.get(name, simple_diamond)
+    strokes = func(rows, cols, spacing, ox, oy) if color is None else func(rows, cols, spacing, ox, oy, color)
+    dots = dot_centers(rows, cols, spacing, ox, oy)
+    return Kolam(rows, cols, spacing, dots, [strokes], dot_color=dot_color, background=background)
+
+# ---------------- Renderers ----------------
+def render_turtle(kolam, pen, dots=True):
+    """Replay a Kolam (or a single Strokes layer) on a turtle pen."""
+    layers = kolam.layers if isinstance(kolam, Kolam) else [kolam]
+    if dots and isinstance(kolam, Kolam):
+        pen.pensize(1)
+        pen.color(kolam.dot_color)  # same colour as the dots: no pen change per dot
+        for x, y in kolam.dots:
+            pen.penup(); pen.goto(x, y)
+            pen.dot(kolam.dot_size, kolam.dot_color)
+    for layer in layers:
+        if layer.fill:
+            pen.fillcolor(layer.color)
+            for poly in layer.polylines():
+                pen.penup(); pen.goto(*poly[0])
+                pen.begin_fill()
+                for x, y in poly[1:]:
+                    pen.goto(x, y)
+                pen.end_fill()
+            continue
+        pen.color(layer.color)
+        pen.pensize(layer.width)
+        for line in layer.polylines():
+            pen.penup(); pen.goto(*line[0]); pen.pendown()
+            for x, y in line[1:]:
+                pen.goto(x, y)
+        for cx, cy, r, start, sweep in layer.arcs:
+            a = math.radians(start)
+            pen.penup(); pen.goto(cx + r * math.cos(a), cy + r * math.sin(a))
+            pen.setheading(start + 90 if sweep >= 0 else start - 90)
+            pen.pendown(); pen.circle(r if sweep >= 0 else -r, abs(sweep))
+        pen.penup()
+        for x, y, size in layer.dots:
+            pen.goto(x, y)
+            pen.dot(size, layer.color)
+    pen.penup()
+
+def _svg_arc(cx, cy, r, start, sweep):
+    # SVG cannot draw a full circle with one arc command, so split long sweeps
+    n = max(1, int(math.ceil(abs(sweep) / 180.0)))
+    step = sweep / n
+    a = math.radians(start)
+    d = [f"M{cx + r * math.cos(a):.2f},{cy + r * math.sin(a):.2f}"]
+    for k in range(1, n + 1):
+        a = math.radians(start + step * k)
+        d.append(f"A{r:.2f},{r:.2f} 0 0,{1 if sweep > 0 else 0} {cx + r * math.cos(a):.2f},{cy + r * math.sin(a):.2f}")
+    return "".join(d)
+
+def _attr(value):
+    """Attribute-safe text: colours may come straight from a request."""
+    return escape(str(value), {'"': "&quot;"})
+
+def render_svg(kolam):
+    """SVG document string; arcs are emitted as true SVG arcs."""
+    w, h = kolam.canvas_size()
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" viewBox="{-w / 2} {-h / 2} {w} {h}">',
+           f'<rect x="{-w / 2}" y="{-h / 2}" width="{w}" height="{h}" fill="{_attr(kolam.background)}"/>',
+           '<g transform="scale(1,-1)">']
+    for layer in kolam.layers:
+        if layer.fill:
+            d = ["M" + " L".join(f"{x:.2f},{y:.2f}" for x, y in poly) + " Z" for poly in layer.polylines()]
+            if d:
+                out.append(f'<path d="{" ".join(d)}" fill="{_attr(layer.color)}" stroke="none"/>')
+            continue
+        d = ["M" + " L".join(f"{x:.2f},{y:.2f}" for x, y in line) for line in layer.polylines()]
+        d += [_svg_arc(*arc) for arc in layer.arcs]
+        if d:
+            out.append(f'<path d="{" ".join(d)}" fill="none" stroke="{_attr(layer.color)}" stroke-width="{_attr(layer.width)}"/>')
+        out += [f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{s / 2}" fill="{_attr(layer.color)}"/>' for x, y, s in layer.dots]
+    r = kolam.dot_size / 2
+    out += [f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{r}" fill="{_attr(kolam.dot_color)}"/>' for x, y in kolam.dots]
+    out.append("</g></svg>")
+    return "\n".join(out)
+
+def render_png(kolam, dpi=300):
+    """PNG bytes, rasterized in memory by kolam_raster (needs Pillow)."""
+    from kolam_raster import png_bytes
+    return png_bytes(kolam, dpi)
+
+RENDERERS = {
+    "turtle": render_turtle,
+    "svg":    render_svg,
+    "png":    render_png,
+}
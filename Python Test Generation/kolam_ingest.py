@@ -0,0 +1,102 @@
+# kolam_ingest.py
+"""
+Streaming ingester for MATLAB tile dumps (kolam_data_numerical.txt).
+
+Replaces the Node convertKolamData.js step.  The text dump is read one line
+at a time; each pattern's points go into an array preallocated from its
+"Number of points:" line and are handed to a kolam_tilestore writer as soon
+as the pattern ends, so memory is bounded by the largest single pattern.
+
+    python kolam_ingest.py                                   # default dump -> .npz store
+    python kolam_ingest.py dump.txt tiles.npz
+    python kolam_ingest.py dump.txt kolamPatternsData.json   # same JSON as the Node script
+"""
+import os
+import re
+import sys
+from datetime import datetime, timezone
+import numpy as np
+
+from kolam_tilestore import DATA_DIR, TILE_STORE, JsonWriter, StoreWriter
+
+DUMP_FILE = os.path.join(DATA_DIR, "..", "..", "scripts", "kolam_data_numerical.txt")
+DESCRIPTION = "Kolam curve patterns extracted"
+
+_PATTERN = re.compile(r"--- Pattern (\d+) ---")
+_COUNT = re.compile(r"Number of points:\s*(\d+)")
+_POINT = re.compile(r"x=([-\d.]+),\s*y=([-\d.]+)")
+
+# ---------------- Connectivity heuristics (same as convertKolamData.js) ----------------
+def has_down_connection(points):
+    if not len(points):
+        return False
+    y = points.imag
+    return bool(y.max() - y.min() > 0.3 and y[-1] > 0.1)
+
+def has_right_connection(points):
+    if not len(points):
+        return False
+    x = points.real
+    return bool(x.max() - x.min() > 0.3 and x[-1] > 0.1)
+
+# ---------------- Parser ----------------
+def iter_patterns(lines):
+    """Yield (id, complex64 points) per pattern from an iterable of dump lines."""
+    tile_id = None
+    buf = np.empty(0, dtype=np.complex64)
+    n = 0
+    for line in lines:
+        line = line.strip()
+        if line.startswith("--- Pattern"):
+            if tile_id is not None and n:
+                yield tile_id, buf[:n]
+            m = _PATTERN.match(line)
+            tile_id = int(m.group(1)) if m else None
+            buf = np.empty(128, dtype=np.complex64)
+            n = 0
+        elif tile_id is None:
+            continue
+        elif line.startswith("Number of points"):
+            m = _COUNT.match(line)
+            if m and n == 0:
+                buf = np.empty(max(int(m.group(1)), 1), dtype=np.complex64)
+        elif "Point" in line and "x=" in line:
+            m = _POINT.search(line)
+            if not m:
+                continue
+            if n == len(buf):
+                # count line missing or wrong: grow geometrically
+                buf = np.concatenate([buf, np.empty(len(buf), dtype=np.complex64)])
+            buf[n] = complex(float(m.group(1)), float(m.group(2)))
+            n += 1
+    if tile_id is not None and n:
+        yield tile_id, buf[:n]
+
+def ingest(src=DUMP_FILE, dst=TILE_STORE):
+    """Stream a dump into a .npz store or .json tile file; returns the pattern count."""
+    meta = {
+        "description": DESCRIPTION,
+        "extractedAt": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+    }
+    writer = JsonWriter(dst, meta) if dst.lower().endswith(".json") else StoreWriter(dst, meta)
+    count = 0
+    with open(src, encoding="utf-8") as f:
+        for tile_id, points in iter_patterns(f):
+            writer.add(tile_id, points, has_down_connection(points), has_right_connection(points))
+            count += 1
+    writer.close()
+    return count
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) > 2:
+        print("usage: python kolam_ingest.py [dump.txt] [out.npz|out.json]")
+        return 2
+    src = argv[0] if argv else DUMP_FILE
+    dst = argv[1] if len(argv) > 1 else TILE_STORE
+    count = ingest(src, dst)
+    print(f"Wrote {count} pattern(s) to {dst}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# kolam_raster.py
+"""
+In-memory PNG export for kolams.
+
+Geometry (kolam_geometry.Kolam) or a live turtle/Tk canvas is drawn straight
+into a supersampled Pillow buffer and box-filtered down for anti-aliasing.
+No postscript, no Ghostscript and no shared temp.eps on disk.
+"""
+import io
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+
+from kolam_geometry import Kolam
+
+SCREEN_DPI = 96                 # dpi at which 1 turtle pixel == 1 image pixel
+SUPERSAMPLE = 4                 # anti-aliasing factor (drawn at 4x, reduced)
+MAX_BUFFER_PIXELS = 16_000_000  # cap on the supersampled buffer; high dpi drops to 2x
+
+# ---------------- Drawing buffer ----------------
+class _Buffer:
+    """Supersampled RGB buffer with a world -> pixel transform."""
+
+    def __init__(self, x0, y0, width, height, dpi, background, supersample, y_up=True):
+        scale = dpi / SCREEN_DPI
+        out_w = max(1, int(round(width * scale)))
+        out_h = max(1, int(round(height * scale)))
+        ss = max(1, int(supersample))
+        while ss > 1 and out_w * out_h * ss * ss > MAX_BUFFER_PIXELS:
+            ss -= 1
+        self.ss = ss
+        self.k = scale * ss
+        self.x0, self.y0 = x0, y0
+        self.y_up = y_up
+        self.image = Image.new("RGB", (out_w * ss, out_h * ss), background)
+        self.draw = ImageDraw.Draw(self.image)
+
+    def to_pixels(self, pts):
+        pts = np.asarray(pts, dtype=float).reshape(-1, 2)
+        px = (pts[:, 0] - self.x0) * self.k
+        py = ((self.y0 - pts[:, 1]) if self.y_up else (pts[:, 1] - self.y0)) * self.k
+        return np.column_stack([px, py])
+
+    def width(self, w):
+        return max(1, int(round(w * self.k)))
+
+    def line(self, pts, color, width):
+        if len(pts) > 1:
+            self.draw.line(self.to_pixels(pts).ravel().tolist(), fill=color,
+                           width=self.width(width), joint="curve")
+
+    def polygon(self, pts, fill, outline, width):
+        if len(pts) > 2:
+            self.draw.polygon(self.to_pixels(pts).ravel().tolist(), fill=fill,
+                              outline=outline, width=self.width(width))
+
+    def arcs(self, arcs, color, width):
+        """Native Pillow arcs; the stroke is centred on the radius."""
+        w = self.width(width)
+        centers = self.to_pixels(arcs[:, :2])
+        radii = arcs[:, 2] * self.k + w / 2
+        if self.y_up:
+            starts, ends = -(arcs[:, 3] + arcs[:, 4]), -arcs[:, 3]
+        else:
+            starts, ends = arcs[:, 3], arcs[:, 3] + arcs[:, 4]
+        lo, hi = np.minimum(starts, ends), np.maximum(starts, ends)
+        for (cx, cy), r, a, b in zip(centers.tolist(), radii.tolist(), lo.tolist(), hi.tolist()):
+            if b - a >= 360:
+                self.draw.ellipse([cx - r, cy - r, cx + r, cy + r], outline=color, width=w)
+            else:
+                self.draw.arc([cx - r, cy - r, cx + r, cy + r], a, b, fill=color, width=w)
+
+    def ellipse(self, x1, y1, x2, y2, fill):
+        (ax, ay), (bx, by) = self.to_pixels([(x1, y1), (x2, y2)])
+        self.draw.ellipse([min(ax, bx), min(ay, by), max(ax, bx), max(ay, by)], fill=fill)
+
+    def finish(self):
+        return self.image.reduce(self.ss) if self.ss > 1 else self.image
+
+# ---------------- Geometry -> image ----------------
+def rasterize(kolam, dpi=SCREEN_DPI, supersample=SUPERSAMPLE):
+    """Render a Kolam to a Pillow RGB image at the given dpi."""
+    w, h = kolam.canvas_size()
+    buf = _Buffer(-w / 2, h / 2, w, h, dpi, ImageColor.getrgb(kolam.background), supersample)
+    for layer in kolam.layers:
+        color = ImageColor.getrgb(layer.color)
+        if layer.fill:
+            for poly in layer.polylines():
+                buf.polygon(poly, color, None, 0)
+            continue
+        for line in layer.polylines():
+            buf.line(line, color, layer.width)
+        if len(layer.arcs):
+            buf.arcs(layer.arcs, color, layer.width)
+        for x, y, s in layer.dots:
+            buf.ellipse(x - s / 2, y - s / 2, x + s / 2, y + s / 2, color)
+    r = kolam.dot_size / 2
+    dot_color = ImageColor.getrgb(kolam.dot_color)
+    for x, y in kolam.dots:
+        buf.ellipse(x - r, y - r, x + r, y + r, dot_color)
+    return buf.finish()
+
+def to_array(kolam, dpi=SCREEN_DPI, supersample=SUPERSAMPLE):
+    """(H, W, 3) uint8 array of the rendered kolam."""
+    return np.asarray(rasterize(kolam, dpi, supersample))
+
+# ---------------- Tk canvas -> image ----------------
+def _tk_color(canvas, color):
+    if not color:
+        return None
+    r, g, b = canvas.winfo_rgb(color)
+    return r >> 8, g >> 8, b >> 8
+
+def rasterize_canvas(canvas, dpi=SCREEN_DPI, supersample=SUPERSAMPLE):
+    """
+    Render the visible part of a turtle/Tk canvas from its items
+    (lines, ovals, polygons), the same region canvas.postscript() would export.
+    """
+    x0, y0 = canvas.canvasx(0), canvas.canvasy(0)
+    w, h = canvas.winfo_width(), canvas.winfo_height()
+    bg = _tk_color(canvas, canvas.cget("bg")) or (255, 255, 255)
+    buf = _Buffer(x0, y0, w, h, dpi, bg, supersample, y_up=False)
+    for item in canvas.find_all():
+        if canvas.itemcget(item, "state") == "hidden":
+            continue
+        kind = canvas.type(item)
+        coords = canvas.coords(item)
+        if kind == "line":
+            color = _tk_color(canvas, canvas.itemcget(item, "fill"))
+            if color:
+                buf.line(coords, color, float(canvas.itemcget(item, "width")))
+        elif kind == "oval" and len(coords) == 4:
+            color = _tk_color(canvas, canvas.itemcget(item, "fill"))
+            if color:
+                buf.ellipse(*coords, color)
+        elif kind == "polygon" and max(coords) != min(coords):  # hidden turtles collapse to a point
+            fill = _tk_color(canvas, canvas.itemcget(item, "fill"))
+            outline = _tk_color(canvas, canvas.itemcget(item, "outline"))
+            if fill or outline:
+                buf.polygon(coords, fill, outline, float(canvas.itemcget(item, "width")))
+    return buf.finish()
+
+# ---------------- Saving ----------------
+def encode(image, fmt="PNG", dpi=SCREEN_DPI):
+    """Encode a Pillow image to bytes (PNG by default), tagging its dpi."""
+    buf = io.BytesIO()
+    image.save(buf, format=fmt, dpi=(dpi, dpi))
+    return buf.getvalue()
+
+def png_bytes(kolam, dpi=300, supersample=SUPERSAMPLE):
+    return encode(rasterize(kolam, dpi, supersample), "PNG", dpi)
+
+def save_image(image, file_path, dpi=300):
+    """Write an image (or a Kolam, rendered at dpi) to a .png / .jpg path."""
+    if isinstance(image, Kolam):
+        image = rasterize(image, dpi)
+    if file_path.lower().endswith((".jpg", ".jpeg")):
+        image = image.convert("RGB")
+    image.save(file_path, dpi=(dpi, dpi))
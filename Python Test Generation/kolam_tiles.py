@@ -0,0 +1,204 @@
+# kolam_tiles.py
+"""
+Python port of the dot-grid tile engine in
+Kolam sih/Kolam Generator/src/utils/kolamGenerator.ts (propose_kolam1D.m /
+draw_kolam.m).
+
+Each cell of an N x N matrix holds one of 16 tiles.  A tile may only sit
+under / right of a neighbour whose pt_dn / pt_rt connectivity it mates with,
+and the quarter matrix is mirrored with h_inv / v_inv.  Instead of picking
+tiles one cell at a time, every anti-diagonal of the quarter matrix is
+sampled in one NumPy step: cells on a diagonal only depend on the diagonal
+before it (their up and left neighbours).
+"""
+import os
+import numpy as np
+
+from kolam_geometry import Kolam, Strokes
+from kolam_tilestore import TILE_JSON, TILE_STORE, from_json, load_store
+
+# the packed .npz store when it has been built, else the JSON it came from
+TILE_DATA = os.environ.get("KOLAM_TILE_DATA", TILE_STORE if os.path.exists(TILE_STORE) else TILE_JSON)
+CELL_SPACING = 60
+
+# ---------------- Tile tables (1-indexed tile ids, index 0 unused) ----------------
+def _table(values):
+    return np.array([0] + values, dtype=np.int64)
+
+PT_DN = _table([0, 1, 0, 0, 0, 1, 0, 0, 1, 0, 1, 1, 1, 0, 1, 1])
+PT_RT = _table([0, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0, 1, 1, 1, 0, 1])
+H_INV = _table([1, 2, 5, 4, 3, 9, 8, 7, 6, 10, 11, 12, 15, 14, 13, 16])
+V_INV = _table([1, 4, 3, 2, 5, 7, 6, 9, 8, 10, 11, 14, 13, 12, 15, 16])
+
+TILES = np.arange(1, 17)
+MATE_PT_DN = [np.array([2, 3, 5, 6, 9, 10, 12])]
+MATE_PT_DN.append(np.setdiff1d(np.arange(2, 17), MATE_PT_DN[0]))
+MATE_PT_RT = [np.array([2, 3, 4, 6, 7, 11, 13])]
+MATE_PT_RT.append(np.setdiff1d(np.arange(2, 17), MATE_PT_RT[0]))
+
+H_SELF = TILES[H_INV[1:] == TILES]
+V_SELF = TILES[V_INV[1:] == TILES]
+
+def _valid_table(keep=None):
+    """
+    Lookup of the tiles allowed for every (pt_dn(up), pt_rt(left)) pair,
+    as a padded (4, 16) table plus a (4,) count; row index = 2 * dn + rt.
+    """
+    table = np.ones((4, 16), dtype=np.int64)
+    counts = np.zeros(4, dtype=np.int64)
+    for dn in (0, 1):
+        for rt in (0, 1):
+            valid = np.intersect1d(MATE_PT_DN[dn], MATE_PT_RT[rt])
+            if keep is not None:
+                valid = np.intersect1d(valid, keep)
+            table[2 * dn + rt, :len(valid)] = valid
+            counts[2 * dn + rt] = len(valid)
+    return table, counts
+
+VALID = _valid_table()
+VALID_V_SELF = _valid_table(V_SELF)
+VALID_H_SELF = _valid_table(H_SELF)
+VALID_HV_SELF = _valid_table(np.intersect1d(H_SELF, V_SELF))
+
+def _pick(rng, valid, up, left):
+    """Random valid tile for each (up, left) neighbour pair; 1 when none fits."""
+    table, counts = valid
+    key = 2 * PT_DN[up] + PT_RT[left]
+    n = counts[key]
+    idx = (rng.random(np.shape(key)) * np.maximum(n, 1)).astype(np.int64)
+    return np.where(n > 0, table[key, idx], 1)
+
+# ---------------- Matrix proposal ----------------
+def propose_kolam_1d(size, seed=None):
+    """size x size tile matrix (values 1..16), like proposeKolam1D."""
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    odd = size % 2 != 0
+    hp = (size - 1) // 2 if odd else size // 2
+
+    mat = np.ones((hp + 2, hp + 2), dtype=np.int64)
+
+    # interior, one anti-diagonal at a time
+    for d in range(2, 2 * hp + 1):
+        i = np.arange(max(1, d - hp), min(hp, d - 1) + 1)
+        j = d - i
+        mat[i, j] = _pick(rng, VALID, mat[i - 1, j], mat[i, j - 1])
+
+    # bottom border (must be v-symmetric) and right border (h-symmetric)
+    # are chains along themselves, so they stay scalar loops
+    for j in range(1, hp + 1):
+        mat[hp + 1, j] = _pick(rng, VALID_V_SELF, mat[hp, j], mat[hp + 1, j - 1])
+    for i in range(1, hp + 1):
+        mat[i, hp + 1] = _pick(rng, VALID_H_SELF, mat[i - 1, hp + 1], mat[i, hp])
+    mat[hp + 1, hp + 1] = _pick(rng, VALID_HV_SELF, mat[hp, hp + 1], mat[hp + 1, hp])
+
+    # mirror the quarter into the other three
+    mat1 = mat[1:hp + 1, 1:hp + 1]
+    mat3 = V_INV[mat1[::-1, :]]
+    mat2 = H_INV[mat1[:, ::-1]]
+    mat4 = V_INV[mat2[::-1, :]]
+
+    if not odd:
+        return np.block([[mat1, mat2], [mat3, mat4]])
+    col = mat[1:hp + 1, hp + 1:hp + 2]
+    return np.block([
+        [mat1, col, mat2],
+        [mat[hp + 1:hp + 2, 1:hp + 2], H_INV[mat[hp + 1, hp:0:-1]][None, :]],
+        [mat3, V_INV[mat[hp:0:-1, hp + 1]][:, None], mat4],
+    ])
+
+# ---------------- Tile curves ----------------
+_tiles = None
+
+def load_tiles(path=None):
+    """The 16 tile curves (.npz store or .json) as a list of (P, 2) arrays."""
+    global _tiles
+    if path is None and _tiles is not None:
+        return _tiles
+    source = path or TILE_DATA
+    store = load_store(source) if source.endswith(".npz") else from_json(source)
+    tiles = store.tiles()
+    if path is None:
+        _tiles = tiles
+    return tiles
+
+# ---------------- Glyph cache ----------------
+class GlyphCache:
+    """
+    Tile curves tessellated once per level of detail.  Level k keeps every
+    2**k-th point (plus the end point), so level 0 is the original data.
+    Placing a matrix is then one broadcast per tile id instead of one Python
+    append per point per cell.
+    """
+
+    def __init__(self, tiles):
+        self.tiles = [np.asarray(t, dtype=float).reshape(-1, 2) for t in tiles]
+        self._levels = {}
+
+    def glyphs(self, lod=0):
+        if lod not in self._levels:
+            step = 2 ** lod
+            level = []
+            for t in self.tiles:
+                idx = np.arange(0, len(t), step)
+                if len(t) and idx[-1] != len(t) - 1:
+                    idx = np.append(idx, len(t) - 1)
+                level.append(np.ascontiguousarray(t[idx]))
+            self._levels[lod] = level
+        return self._levels[lod]
+
+    def place(self, M, spacing, lod=0):
+        """
+        (dots, points, offsets) for a tile matrix: y points up, the grid is
+        centred on the origin and row 0 of M is the top row.
+        """
+        M = np.asarray(M)
+        m, n = M.shape
+        ii, jj = np.nonzero(M[::-1] > 0)
+        ids = M[::-1][ii, jj]
+        centers = np.column_stack([(jj + 1 - (n + 1) / 2) * spacing,
+                                   (ii + 1 - (m + 1) / 2) * spacing])
+        glyphs = self.glyphs(lod)
+        chunks, lengths = [], []
+        for tile in np.unique(ids):
+            if tile > len(glyphs) or not len(glyphs[tile - 1]):
+                continue
+            g = glyphs[tile - 1] * spacing
+            at = centers[ids == tile]
+            chunks.append((g[None, :, :] + at[:, None, :]).reshape(-1, 2))
+            lengths.append(np.full(len(at), len(g)))
+        points = np.concatenate(chunks) if chunks else np.zeros((0, 2))
+        offsets = np.concatenate([[0], np.cumsum(np.concatenate(lengths))]) if lengths else np.zeros(1)
+        return centers, points, offsets
+
+def lod_for_spacing(spacing, max_lod=3):
+    """Coarsest level that still leaves about one vertex per 1.5 px of cell."""
+    lod = 0
+    while lod < max_lod and 100 / 2 ** (lod + 1) >= spacing / 1.5:
+        lod += 1
+    return lod
+
+_glyph_cache = None
+
+def glyph_cache():
+    """Shared cache over the default tile data."""
+    global _glyph_cache
+    if _glyph_cache is None:
+        _glyph_cache = GlyphCache(load_tiles())
+    return _glyph_cache
+
+def draw_kolam(M, spacing=CELL_SPACING, color="white", background="black", tiles=None, lod=0):
+    """
+    Geometry for a tile matrix, like drawKolam: one dot and one tile curve
+    per cell.  lod > 0 uses coarser glyphs (see lod_for_spacing).
+    """
+    M = np.asarray(M)
+    cache = glyph_cache() if tiles is None else GlyphCache(tiles)
+    dots, points, offsets = cache.place(M, spacing, lod)
+    strokes = Strokes(points, offsets, color=color, width=1.5)
+    m, n = M.shape
+    return Kolam(m, n, spacing, dots, [strokes],
+                 dot_color=color, background=background, margin=spacing)
+
+def generate_kolam_1d(size, spacing=CELL_SPACING, seed=None, color="white", background="black", lod=0):
+    """Matrix proposal + drawing in one call, like generateKolam1D."""
+    return draw_kolam(propose_kolam_1d(size, seed), spacing, color, background, lod=lod)
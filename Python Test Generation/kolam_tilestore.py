@@ -0,0 +1,248 @@
+# kolam_tilestore.py
+"""
+Packed binary store for the kolam tile curves (kolamPatternsData.json).
+
+The store is an ordinary *uncompressed* .npz holding
+
+    points  : (P,) complex64, every tile's points back to back (x + iy,
+              the same layout as pt{} in kolam_data.mat)
+    offsets : (T + 1,) int64, tile k is points[offsets[k]:offsets[k+1]]
+    ids, down, right : per-tile id and hasDown/RightConnection flags
+    meta    : JSON string with the remaining top-level fields
+
+Because the members are stored, not deflated, load_store() memory-maps them
+straight out of the zip file: opening the store parses no JSON and copies no
+point data.  np.load() still reads it like any other .npz.
+
+    python kolam_tilestore.py to-npz  kolamPatternsData.json kolamPatternsData.npz
+    python kolam_tilestore.py to-json kolamPatternsData.npz  kolamPatternsData.json
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Kolam sih",
+                        "Kolam Generator", "src", "data")
+TILE_JSON = os.path.join(DATA_DIR, "kolamPatternsData.json")
+TILE_STORE = os.path.join(DATA_DIR, "kolamPatternsData.npz")
+
+# ---------------- Store object ----------------
+class TileStore:
+    """Zero-copy view over a packed store (or over arrays built in memory)."""
+
+    def __init__(self, points, offsets, ids, down, right, meta=None):
+        self.points = points
+        self.offsets = offsets
+        self.ids = ids
+        self.down = down
+        self.right = right
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def xy(self):
+        """(P, 2) float32 view of the complex points (no copy)."""
+        return self.points.view(np.float32).reshape(-1, 2)
+
+    def tile(self, k):
+        """Points of the k-th tile (0-based) as an (n, 2) float32 view."""
+        return self.xy()[self.offsets[k]:self.offsets[k + 1]]
+
+    def tiles(self):
+        """All tiles as (n, 2) views, in id order."""
+        xy = self.xy()
+        return [xy[a:b] for a, b in zip(self.offsets[:-1], self.offsets[1:])]
+
+# ---------------- JSON <-> arrays ----------------
+def from_json(path=TILE_JSON):
+    """Read the JSON tile file into a TileStore."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    patterns = sorted(data["patterns"], key=lambda p: p["id"])
+    counts = [len(p["points"]) for p in patterns]
+    points = np.empty(sum(counts), dtype=np.complex64)
+    points.real = [pt["x"] for p in patterns for pt in p["points"]]
+    points.imag = [pt["y"] for p in patterns for pt in p["points"]]
+    meta = {k: v for k, v in data.items() if k != "patterns"}
+    return TileStore(points,
+                     np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+                     np.array([p["id"] for p in patterns], dtype=np.int32),
+                     np.array([p.get("hasDownConnection", False) for p in patterns]),
+                     np.array([p.get("hasRightConnection", False) for p in patterns]),
+                     meta)
+
+def _number(v):
+    # shortest text that reads back as the same float32, e.g. 0.2495 not 0.24950000643
+    f = float(str(v))
+    return int(f) if f.is_integer() else f
+
+def to_json_data(store):
+    """The JSON document for a store, same shape as convertKolamData.js writes."""
+    data = dict(store.meta)
+    data["totalPatterns"] = len(store)
+    patterns = []
+    for k in range(len(store)):
+        pts = store.points[store.offsets[k]:store.offsets[k + 1]]
+        patterns.append({
+            "id": int(store.ids[k]),
+            "points": [{"x": _number(p.real), "y": _number(p.imag)} for p in pts],
+            "hasDownConnection": bool(store.down[k]),
+            "hasRightConnection": bool(store.right[k]),
+        })
+    data["patterns"] = patterns
+    return data
+
+def write_json(store, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_json_data(store), f, indent="\t")
+
+# ---------------- Binary store ----------------
+def save_store(store, path=TILE_STORE):
+    """Write an uncompressed .npz (stored members are what make mmap possible)."""
+    np.savez(path, points=np.ascontiguousarray(store.points, dtype=np.complex64),
+             offsets=np.asarray(store.offsets, dtype=np.int64),
+             ids=np.asarray(store.ids, dtype=np.int32),
+             down=np.asarray(store.down, dtype=bool),
+             right=np.asarray(store.right, dtype=bool),
+             meta=np.array(json.dumps(store.meta)))
+
+def _mmap_member(path, zf, name):
+    """Memory-map one stored .npy member of a zip without reading it."""
+    info = zf.getinfo(name)
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError(f"{name} in {path} is compressed; re-save with save_store()")
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        local = f.read(30)
+        name_len = int.from_bytes(local[26:28], "little")
+        extra_len = int.from_bytes(local[28:30], "little")
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if dtype.hasobject:
+        raise ValueError(f"{name} in {path} holds Python objects")
+    if not shape or int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran else "C")
+
+def load_store(path=TILE_STORE, mmap=True):
+    """Open a store; with mmap the point data stays on disk until touched."""
+    if not mmap:
+        with np.load(path) as z:
+            return TileStore(z["points"], z["offsets"], z["ids"], z["down"], z["right"],
+                             json.loads(str(z["meta"])))
+    with zipfile.ZipFile(path) as zf:
+        arrays = {n[:-4]: _mmap_member(path, zf, n) for n in zf.namelist() if n != "meta.npy"}
+        meta = json.loads(str(np.load(zf.open("meta.npy"))))
+    return TileStore(arrays["points"], arrays["offsets"], arrays["ids"],
+                     arrays["down"], arrays["right"], meta)
+
+# ---------------- Streaming writers ----------------
+class StoreWriter:
+    """
+    Builds a .npz store one tile at a time.  Points spill to a temp file and
+    are copied into the zip in chunks, so memory stays at one tile plus the
+    small per-tile index however large the export is.
+    """
+
+    def __init__(self, path, meta=None):
+        self.path = path
+        self.meta = dict(meta or {})
+        self._spill = tempfile.TemporaryFile()
+        self._offsets = [0]
+        self._ids, self._down, self._right = [], [], []
+
+    def add(self, tile_id, points, down=False, right=False):
+        points = np.ascontiguousarray(points, dtype=np.complex64)
+        self._spill.write(points.tobytes())
+        self._offsets.append(self._offsets[-1] + len(points))
+        self._ids.append(tile_id)
+        self._down.append(bool(down))
+        self._right.append(bool(right))
+
+    def _write_array(self, zf, name, array):
+        buf = io.BytesIO()
+        np.save(buf, array)
+        zf.writestr(name + ".npy", buf.getvalue())
+
+    def close(self):
+        self.meta.setdefault("totalPatterns", len(self._ids))
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+            with zf.open("points.npy", "w", force_zip64=True) as out:
+                np.lib.format.write_array_header_1_0(out, {
+                    "descr": np.lib.format.dtype_to_descr(np.dtype(np.complex64)),
+                    "fortran_order": False,
+                    "shape": (self._offsets[-1],),
+                })
+                self._spill.seek(0)
+                shutil.copyfileobj(self._spill, out, 1 << 20)
+            self._write_array(zf, "offsets", np.array(self._offsets, dtype=np.int64))
+            self._write_array(zf, "ids", np.array(self._ids, dtype=np.int32))
+            self._write_array(zf, "down", np.array(self._down, dtype=bool))
+            self._write_array(zf, "right", np.array(self._right, dtype=bool))
+            self._write_array(zf, "meta", np.array(json.dumps(self.meta)))
+        self._spill.close()
+
+class JsonWriter:
+    """
+    Writes the JSON tile file one pattern at a time, in the same layout as
+    write_json().  Patterns go to a temp file first because totalPatterns
+    comes before them in the document.
+    """
+
+    def __init__(self, path, meta=None):
+        self.path = path
+        self.meta = dict(meta or {})
+        self._spill = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._count = 0
+
+    def add(self, tile_id, points, down=False, right=False):
+        pattern = {
+            "id": int(tile_id),
+            "points": [{"x": _number(p.real), "y": _number(p.imag)}
+                       for p in np.asarray(points, dtype=np.complex64)],
+            "hasDownConnection": bool(down),
+            "hasRightConnection": bool(right),
+        }
+        text = json.dumps(pattern, indent="\t").replace("\n", "\n\t\t")
+        self._spill.write((",\n\t\t" if self._count else "\t\t") + text)
+        self._count += 1
+
+    def close(self):
+        self.meta["totalPatterns"] = self._count
+        head = json.dumps(self.meta, indent="\t")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(head[:-2] + ',\n\t"patterns": [\n' if self.meta else '{\n\t"patterns": [\n')
+            self._spill.seek(0)
+            shutil.copyfileobj(self._spill, f, 1 << 20)
+            f.write("\n\t]\n}")
+        self._spill.close()
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] not in ("to-npz", "to-json"):
+        print(__doc__.strip().splitlines()[-2].strip())
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 2
+    cmd, src, dst = argv
+    if cmd == "to-npz":
+        save_store(from_json(src), dst)
+    else:
+        write_json(load_store(src), dst)
+    print(f"Wrote {dst}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
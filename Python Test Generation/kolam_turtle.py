@@ -0,0 +1,429 @@
+# kolam_turtle.py
+"""
+Headless stand-in for the turtle module.
+
+Screen / TurtleScreen / Turtle / RawTurtle (and the module-level functions
+such as turtle.forward) keep the turtle API but record every move into
+kolam_geometry arrays instead of animating a Tk canvas; circle(r, extent)
+is one analytic arc (or a polygon of `steps` sides when steps is given).  Any script in this folder can then run without an X
+display:
+
+    import kolam_turtle
+    kolam_turtle.install()          # `import turtle` now gets this module
+    import kolam_star
+    kolam_star.draw_star_spiral(10, 5, 1)
+    png = kolam_turtle.Screen().render("png", dpi=150)
+
+Fills (begin_fill / end_fill) become filled layers, drawn under the strokes.
+Text (write) is not recorded and raises a warning.
+"""
+import math
+import sys
+import warnings
+import numpy as np
+
+from kolam_geometry import Cursor, Kolam, RENDERERS, Strokes, arc_points, concat
+
+FIT_MARGIN = 20  # padding around the drawing when setup() was never called
+
+# ---------------- Colours ----------------
+def _color_string(args, mode):
+    """turtle colour arguments -> a string renderers understand."""
+    if len(args) == 1:
+        args = args[0]
+    if isinstance(args, str):
+        return args
+    r, g, b = args
+    if mode == 1.0:
+        r, g, b = (int(round(v * 255)) for v in (r, g, b))
+    return "#%02x%02x%02x" % (int(r), int(g), int(b))
+
+# ---------------- Screen ----------------
+class TurtleScreen:
+    """Records the screen settings; the canvas argument is accepted and ignored."""
+
+    def __init__(self, cv=None, mode="standard", colormode=1.0):
+        self._bg = "white"
+        self._title = ""
+        self._size = None
+        self._colormode = colormode
+        self._turtles = []
+
+    # -- settings --
+    def bgcolor(self, *args):
+        if not args:
+            return self._bg
+        self._bg = _color_string(args, self._colormode)
+
+    def title(self, titlestring):
+        self._title = titlestring
+
+    def setup(self, width=None, height=None, startx=None, starty=None):
+        # fractions of the monitor (turtle's defaults) mean nothing headless
+        if isinstance(width, int) and isinstance(height, int):
+            self._size = (width, height)
+
+    def screensize(self, canvwidth=None, canvheight=None, bg=None):
+        if canvwidth is None and canvheight is None and bg is None:
+            return self._size
+        if canvwidth is not None and canvheight is not None:
+            self._size = (int(canvwidth), int(canvheight))
+        if bg is not None:
+            self.bgcolor(bg)
+
+    def colormode(self, cmode=None):
+        if cmode is None:
+            return self._colormode
+        self._colormode = float(cmode) if cmode == 1.0 else int(cmode)
+
+    def turtles(self):
+        return list(self._turtles)
+
+    def clear(self):
+        for t in self._turtles:
+            t.clear()
+
+    reset = clear
+
+    # -- animation / event loop: nothing to do headless --
+    def tracer(self, n=None, delay=None):
+        return 0 if n is None else None
+
+    def delay(self, delay=None):
+        return 0 if delay is None else None
+
+    def update(self):
+        pass
+
+    def mainloop(self):
+        pass
+
+    done = mainloop
+    exitonclick = mainloop
+
+    def bye(self):
+        pass
+
+    def listen(self, xdummy=None, ydummy=None):
+        pass
+
+    def onkey(self, fun, key):
+        pass
+
+    onkeypress = onkey
+    onkeyrelease = onkey
+
+    def onclick(self, fun, btn=1, add=None):
+        pass
+
+    onscreenclick = onclick
+
+    def ontimer(self, fun, t=0):
+        pass
+
+    def getcanvas(self):
+        return None
+
+    # -- output --
+    def kolam(self):
+        """Everything recorded so far as a kolam_geometry.Kolam."""
+        layers = [layer for t in self._turtles for layer in t.layers()]
+        size = self._size or _fit(layers)
+        return Kolam(0, 0, 0, np.zeros((0, 2)), layers, background=self._bg, size=size)
+
+    def render(self, fmt="png", **kwargs):
+        """Render the recording with kolam_geometry.RENDERERS[fmt]."""
+        return RENDERERS[fmt](self.kolam(), **kwargs)
+
+def _fit(layers):
+    """Canvas size centred on the origin that holds every primitive."""
+    extent = 0.0
+    for s in layers:
+        if len(s.points):
+            extent = max(extent, np.abs(s.points).max())
+        if len(s.arcs):
+            extent = max(extent, (np.abs(s.arcs[:, :2]) + s.arcs[:, 2:3]).max())
+        if len(s.dots):
+            extent = max(extent, (np.abs(s.dots[:, :2]) + s.dots[:, 2:3] / 2).max())
+    side = int(math.ceil(2 * (extent + FIT_MARGIN)))
+    return side, side
+
+_screen = None
+
+def Screen():
+    """The shared default screen, like turtle.Screen()."""
+    global _screen
+    if _screen is None:
+        _screen = TurtleScreen()
+    return _screen
+
+# ---------------- Turtle ----------------
+class RawTurtle(Cursor):
+    """A turtle that records geometry; one layer per (colour, pensize)."""
+
+    def __init__(self, canvas=None, shape="classic", undobuffersize=1000, visible=True):
+        super().__init__()
+        self.screen = canvas if isinstance(canvas, TurtleScreen) else Screen()
+        self.screen._turtles.append(self)
+        self._pencolor = "black"
+        self._fillcolor = "black"
+        self._pensize = 1
+        self._visible = visible
+        self._store = {}
+        self._fill_path = None
+
+    # -- recorded layers --
+    def _cut(self):
+        """Move what was drawn with the current pen into the layer store."""
+        s = self.drain(self._pencolor, self._pensize)
+        if not s.is_empty():
+            self._store.setdefault((s.color, s.width), []).append(s)
+
+    def layers(self):
+        """Recorded layers, filled ones first so outlines stay on top."""
+        self._cut()
+        layers = [concat(parts) for parts in self._store.values()]
+        return [s for s in layers if s.fill] + [s for s in layers if not s.fill]
+
+    def clear(self):
+        self.drain()
+        self._store = {}
+        self._fill_path = None
+
+    def reset(self):
+        self.clear()
+        self.x = self.y = self._heading = 0.0
+        self._down = True
+        self._pencolor = self._fillcolor = "black"
+        self._pensize = 1
+
+    # -- pen --
+    def pensize(self, width=None):
+        if width is None:
+            return self._pensize
+        if width != self._pensize:
+            self._cut()
+            self._pensize = width
+
+    width = pensize
+
+    def pencolor(self, *args):
+        if not args:
+            return self._pencolor
+        c = _color_string(args, self.screen._colormode)
+        if c != self._pencolor:
+            self._cut()
+            self._pencolor = c
+
+    def fillcolor(self, *args):
+        if not args:
+            return self._fillcolor
+        self._fillcolor = _color_string(args, self.screen._colormode)
+
+    def color(self, *args):
+        if not args:
+            return self._pencolor, self._fillcolor
+        if len(args) == 2:
+            self.pencolor(args[0])
+            self.fillcolor(args[1])
+        else:
+            self.pencolor(*args)
+            self.fillcolor(*args)
+
+    def dot(self, size=None, *color):
+        if size is None:
+            size = max(self._pensize + 4, 2 * self._pensize)
+        if not color:
+            return super().dot(size)
+        c = _color_string(color, self.screen._colormode)
+        if c == self._pencolor:
+            return super().dot(size)
+        self._cut()
+        super().dot(size)
+        s = self.drain(c, self._pensize)
+        self._store.setdefault((c, self._pensize), []).append(s)
+
+    def isdown(self):
+        return self._down
+
+    pu = up = Cursor.penup
+    pd = down = Cursor.pendown
+
+    # -- motion aliases and queries --
+    def back(self, distance):
+        self.forward(-distance)
+
+    fd = Cursor.forward
+    bk = backward = back
+    lt = Cursor.left
+    rt = Cursor.right
+    seth = Cursor.setheading
+
+    def goto(self, x, y=None):
+        if y is None:
+            x, y = x
+        super().goto(x, y)
+        if self._fill_path is not None:
+            self._fill_path.append((self.x, self.y))
+
+    setpos = setposition = goto
+
+    def setx(self, x):
+        self.goto(x, self.y)
+
+    def sety(self, y):
+        self.goto(self.x, y)
+
+    def home(self):
+        self.goto(0, 0)
+        self.setheading(0)
+
+    def circle(self, radius, extent=None, steps=None):
+        if extent is None:
+            extent = 360.0
+        if steps:
+            # inscribed polygon, the same walk turtle.circle makes
+            w = extent / steps
+            side = 2.0 * radius * math.sin(math.radians(w / 2))
+            if radius < 0:
+                side, w = -side, -w
+            self.left(w / 2)
+            for _ in range(int(steps)):
+                self.forward(side)
+                self.left(w)
+            self.left(-w / 2)
+            return
+        if self._fill_path is not None and radius:
+            rad = math.radians(self._heading)
+            cx = self.x - radius * math.sin(rad)
+            cy = self.y + radius * math.cos(rad)
+            start = self._heading - 90 if radius >= 0 else self._heading + 90
+            sweep = extent if radius >= 0 else -extent
+            segments = max(4, int(math.ceil(abs(extent) / 5)))
+            self._fill_path.extend(map(tuple, arc_points((cx, cy, abs(radius), start, sweep), segments)[0, 1:]))
+        super().circle(radius, extent)
+
+    pos = Cursor.position
+
+    def towards(self, x, y=None):
+        if y is None:
+            x, y = x
+        return math.degrees(math.atan2(y - self.y, x - self.x)) % 360
+
+    def distance(self, x, y=None):
+        if y is None:
+            x, y = x
+        return math.hypot(x - self.x, y - self.y)
+
+    # -- no visible effect headless --
+    def speed(self, speed=None):
+        return 0 if speed is None else None
+
+    def hideturtle(self):
+        self._visible = False
+
+    def showturtle(self):
+        self._visible = True
+
+    ht, st = hideturtle, showturtle
+
+    def isvisible(self):
+        return self._visible
+
+    def shape(self, name=None):
+        return "classic" if name is None else None
+
+    # -- fills --
+    def begin_fill(self):
+        self._fill_path = [(self.x, self.y)]
+
+    def end_fill(self):
+        path, self._fill_path = self._fill_path, None
+        if path is None or len(path) < 3:
+            return
+        layer = Strokes(path, [0, len(path)], color=self._fillcolor, width=0, fill=True)
+        self._store.setdefault(("fill", self._fillcolor), []).append(layer)
+
+    def filling(self):
+        return self._fill_path is not None
+
+    def write(self, arg, move=False, align="left", font=("Arial", 8, "normal")):
+        warnings.warn("kolam_turtle does not record text; write() is ignored", stacklevel=2)
+
+    def getscreen(self):
+        return self.screen
+
+class Turtle(RawTurtle):
+    """RawTurtle on the shared Screen(), like turtle.Turtle."""
+
+    def __init__(self, shape="classic", undobuffersize=1000, visible=True):
+        super().__init__(Screen(), shape, undobuffersize, visible)
+
+Pen = Turtle
+RawPen = RawTurtle
+
+# ---------------- Module-level functions (turtle.forward(...), ...) ----------------
+_pen = None
+
+def getturtle():
+    global _pen
+    if _pen is None:
+        _pen = Turtle()
+    return _pen
+
+getpen = getturtle
+
+_TURTLE_METHODS = [
+    "forward", "fd", "back", "bk", "backward", "left", "lt", "right", "rt",
+    "goto", "setpos", "setposition", "setx", "sety", "setheading", "seth",
+    "home", "circle", "dot", "penup", "pu", "up", "pendown", "pd", "down",
+    "isdown", "pensize", "width", "color", "pencolor", "fillcolor",
+    "begin_fill", "end_fill", "filling", "speed", "hideturtle", "ht", "showturtle", "st",
+    "isvisible", "clear", "reset", "xcor", "ycor", "position", "pos",
+    "heading", "towards", "distance", "write", "shape",
+]
+_SCREEN_METHODS = [
+    "bgcolor", "title", "setup", "screensize", "colormode", "tracer", "delay",
+    "update", "mainloop", "done", "exitonclick", "bye", "listen", "onkey",
+    "onkeypress", "onkeyrelease", "onscreenclick", "ontimer", "getcanvas",
+]
+
+def _turtle_function(name):
+    def func(*args, **kwargs):
+        return getattr(getturtle(), name)(*args, **kwargs)
+    func.__name__ = name
+    return func
+
+def _screen_function(name):
+    def func(*args, **kwargs):
+        return getattr(Screen(), name)(*args, **kwargs)
+    func.__name__ = name
+    return func
+
+for _name in _TURTLE_METHODS:
+    globals()[_name] = _turtle_function(_name)
+for _name in _SCREEN_METHODS:
+    globals()[_name] = _screen_function(_name)
+
+# ---------------- Install as `turtle` ----------------
+_real_turtle = None
+
+def install():
+    """Make `import turtle` return this module (call before importing a script)."""
+    global _real_turtle
+    if sys.modules.get("turtle") is not sys.modules[__name__]:
+        _real_turtle = sys.modules.get("turtle")
+        sys.modules["turtle"] = sys.modules[__name__]
+
+def uninstall():
+    if sys.modules.get("turtle") is sys.modules[__name__]:
+        if _real_turtle is None:
+            del sys.modules["turtle"]
+        else:
+            sys.modules["turtle"] = _real_turtle
+
+def reset_screen():
+    """Forget every recorded turtle and start a fresh default Screen()."""
+    global _screen, _pen
+    _screen = None
+    _pen = None
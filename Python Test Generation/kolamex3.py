@@ -49,5 +49,6 @@ def generate_kolam(n=9):
     plt.show()
 
 # Run it
-generate_kolam(9)
+if __name__ == "__main__":
+    generate_kolam(9)
 
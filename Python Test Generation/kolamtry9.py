@@ -11,9 +11,9 @@ import time
 import math
 import os
 
-# Optional PIL import for converting postscript -> png
+# Optional PIL import for rasterizing the canvas -> png
 try:
-    from PIL import Image
+    from kolam_raster import rasterize_canvas
     PIL_AVAILABLE = True
 except Exception:
     PIL_AVAILABLE = False
@@ -263,7 +263,7 @@ def reset_all():
     screen.update()
     draw_dot_grid()
 
-# Save function: save postscript then convert with PIL if available
+# Save function: PNG is rasterized in memory with PIL; postscript only on request
 def save_image():
     # ask filename
     fname = filedialog.asksaveasfilename(defaultextension=".png",
@@ -273,32 +273,27 @@ def save_image():
         return
     base, ext = os.path.splitext(fname)
     ps_path = base + ".ps"
-    # Get tkinter canvas and generate postscript
-    try:
-        cv.postscript(file=ps_path, colormode='color')
-    except Exception as e:
-        messagebox.showerror("Save error", f"Could not save postscript: {e}")
-        return
-    if ext.lower() == ".ps":
-        messagebox.showinfo("Saved", f"Saved PostScript to {ps_path}")
-        return
-    # if user asked for png and PIL available, convert
-    if PIL_AVAILABLE:
+    # PNG: draw the canvas items straight into an image buffer
+    if ext.lower() != ".ps" and PIL_AVAILABLE:
         try:
-            img = Image.open(ps_path)
+            img = rasterize_canvas(cv)
             # Trim whitespace: optional
             bbox = img.getbbox()
             if bbox:
                 img = img.crop(bbox)
             img.save(fname, "PNG")
             messagebox.showinfo("Saved", f"Saved PNG to {fname}")
-            # remove ps file if you like:
-            try:
-                os.remove(ps_path)
-            except OSError:
-                pass
         except Exception as e:
-            messagebox.showerror("Conversion error", f"Could not convert to PNG: {e}\nPS saved at {ps_path}")
+            messagebox.showerror("Save error", f"Could not save PNG: {e}")
+        return
+    # Get tkinter canvas and generate postscript
+    try:
+        cv.postscript(file=ps_path, colormode='color')
+    except Exception as e:
+        messagebox.showerror("Save error", f"Could not save postscript: {e}")
+        return
+    if ext.lower() == ".ps":
+        messagebox.showinfo("Saved", f"Saved PostScript to {ps_path}")
     else:
         messagebox.showinfo("Saved PS", f"Pillow not available. Saved PostScript at {ps_path}. To get PNG/PNG use `pip install pillow` and convert the .ps file.")
 